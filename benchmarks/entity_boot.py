@@ -0,0 +1,52 @@
+"""
+Time loading the entity index at boot. It needs Django set up with the game's settings and
+the app's services created, so run it from the game's -py console:
+
+    exec(open('benchmarks/entity_boot.py').read()); bench_boot()
+"""
+import datetime
+
+import pytz
+from django.db import transaction
+from honahlee.utils.misc import fresh_uuid4
+
+from mudslide.entities.base import BaseEntity
+from mudslide.models import Entity, EntityType
+from mudslide.services.entity import EntityService
+
+
+def bench_boot(count=100000, batch=5000):
+    """
+    Time loading entities at boot. `count` entities are created inside a transaction that
+    is rolled back afterwards, so this is safe to run against a development database.
+    Django must be set up and the app's services created.
+
+    Args:
+        count (int): How many entities to create.
+        batch (int): Rows per bulk insert.
+
+    Returns:
+        times (dict): The stage timings from load_entities().
+    """
+    app = BaseEntity.app
+    with transaction.atomic():
+        en_type, created = EntityType.objects.get_or_create(name='_bench')
+        now = datetime.datetime.utcnow().replace(tzinfo=pytz.utc)
+        pending = list()
+        for i in range(count):
+            uuid = fresh_uuid4(())
+            pending.append(Entity(uuid=uuid, entity_type=en_type, date_created=now, name=f"Bench{i}",
+                                  iname=f"bench{i}"))
+            if len(pending) >= batch:
+                Entity.objects.bulk_create(pending)
+                pending.clear()
+        if pending:
+            Entity.objects.bulk_create(pending)
+
+        srv = EntityService()
+        srv.app = app
+        srv.type_map = app.classes['entities'] if app else dict()
+        times = srv.load_entities()
+        print(f"{count} entities: " + ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in times.items()))
+        transaction.set_rollback(True)
+    return times
@@ -0,0 +1,46 @@
+"""
+Measure the memory used by the entity index and by entity objects. No database is needed,
+but importing the entity service needs Django set up, so run it from the game's -py console:
+
+    exec(open('benchmarks/entity_memory.py').read()); bench_memory()
+"""
+import sys
+import tracemalloc
+import uuid as uuid_module
+from types import SimpleNamespace
+
+from mudslide.entities.base import BaseEntity
+from mudslide.services.entity import EntityService
+
+
+def bench_memory(count=100000):
+    """
+    Measure the memory used by index rows and by resident entities, per `count` entities.
+    Entities are built from stand-in model rows.
+
+    Args:
+        count (int): How many entities to measure.
+
+    Returns:
+        sizes (dict): Bytes used by the index and by the entity objects.
+    """
+    rows = [SimpleNamespace(pk=i, uuid=uuid_module.uuid4(), name=f"Name{i}", entity_type_id=1)
+            for i in range(count)]
+    sizes = dict()
+
+    tracemalloc.start()
+    srv = EntityService()
+    before = tracemalloc.get_traced_memory()[0]
+    for row in rows:
+        srv.index[row.pk] = (row.uuid.int, row.entity_type_id, sys.intern(row.name.lower()))
+        srv.uuid_index[row.uuid.int] = row.pk
+    sizes['index'] = tracemalloc.get_traced_memory()[0] - before
+
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [BaseEntity(row) for row in rows]
+    sizes['entities'] = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{count} entities: " + ", ".join(f"{k} {v / 1048576:.1f}MB ({v / count:.0f}B each)"
+                                            for k, v in sizes.items()))
+    return sizes
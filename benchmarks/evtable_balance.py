@@ -0,0 +1,41 @@
+"""
+Time rendering WHO-style tables of different sizes.
+
+    python benchmarks/evtable_balance.py [rows ...]
+"""
+import sys
+import time
+
+from mudslide.utils.evtable import EvTable
+
+
+def bench_balance(sizes=(10, 100, 1000, 5000), repeat=3):
+    """
+    Time rendering WHO-style tables of different sizes.
+
+    Args:
+        sizes (iterable): Row counts to try.
+        repeat (int): Renders per size; the best time is reported.
+
+    Returns:
+        results (dict): Best render time in seconds per row count.
+
+    """
+    results = dict()
+    for size in sizes:
+        table = EvTable("|wName|n", "|wIdle|n", "|wLocation|n", border="cells")
+        for i in range(size):
+            table.add_row("Player%i" % i, "|y%im|n" % (i % 60), "The Plaza, corner %i" % i)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            str(table)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[size] = best
+        print("%6i rows: %8.1f ms" % (size, best * 1000))
+    return results
+
+
+if __name__ == "__main__":
+    bench_balance(*([[int(arg) for arg in sys.argv[1:]]] if sys.argv[1:] else []))
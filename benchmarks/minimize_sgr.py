@@ -0,0 +1,48 @@
+"""
+Report how many bytes minimize_sgr saves on some typical screens.
+
+    python benchmarks/minimize_sgr.py [rows]
+"""
+import sys
+import zlib
+
+from mudslide.utils.ansi import minimize_sgr
+from mudslide.utils.evtable import EvTable
+
+
+def bench_minimize(rows=100):
+    """
+    Report how many bytes `minimize_sgr` saves on some typical screens, both as
+    sent plain and after zlib compression like MCCP does.
+
+    Args:
+        rows (int): Number of rows in the test tables.
+
+    Returns:
+        results (list): One `(name, raw, minimized, raw_mccp, minimized_mccp)` tuple
+            per screen, sizes in bytes.
+
+    """
+    who = EvTable("|wName|n", "|wIdle|n", "|wLocation|n", border="cells", border_left_char="|b||n",
+                  border_right_char="|b||n", corner_char="|b+|n", border_top_char="|b-|n",
+                  border_bottom_char="|b-|n")
+    for i in range(rows):
+        who.add_row("|c%s|n" % ("Player%i" % i), "|y%im|n" % (i % 60), "|gThe |wPlaza|g, corner %i|n" % i)
+    scores = EvTable("|yHeading1|n", "|B|[GHeading2|n", "Heading3")
+    for i in range(rows):
+        scores.add_row("This is col 0, row %i" % i, "|gThis is col 1, row |w%i|n|g.|n" % i,
+                       "|500This |050is |005col |n2, row %i" % i)
+    screens = (("who", str(who)), ("scores", str(scores)))
+
+    results = []
+    for name, text in screens:
+        plain = text.encode("utf-8")
+        small = minimize_sgr(text).encode("utf-8")
+        results.append((name, len(plain), len(small), len(zlib.compress(plain, 9)),
+                        len(zlib.compress(small, 9))))
+        print("%-8s raw %7i -> %7i   mccp %6i -> %6i" % ((name,) + results[-1][1:]))
+    return results
+
+
+if __name__ == "__main__":
+    bench_minimize(*[int(arg) for arg in sys.argv[1:2]])
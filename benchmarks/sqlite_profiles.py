@@ -0,0 +1,71 @@
+"""
+Compare SQLite profiles through Django's own connections, so each profile's pragmas are
+applied by the connection_created hook exactly as the game applies them. It needs Django set
+up with the game's settings, so run it from the game's -py console:
+
+    exec(open('benchmarks/sqlite_profiles.py').read()); bench_profiles()
+"""
+import copy
+import os
+import tempfile
+import time
+
+from django.db import connections, transaction
+
+from mudslide.utils.sqlite import TUNED_PRAGMAS, _PROFILE, install_profile
+
+
+def bench_profiles(writes=5000, reads=20000, profiles=None):
+    """
+    Compare SQLite profiles on a scratch database: single-row committed writes, like the
+    game makes, and primary key reads. The scratch database is opened as an extra Django
+    connection, and the game's own profile is put back afterwards.
+
+    Args:
+        writes (int): How many rows to insert, each in its own transaction.
+        reads (int): How many rows to read back.
+        profiles (dict, optional): Pragmas by profile name. Defaults to default vs tuned.
+
+    Returns:
+        results (dict): Seconds for writes and reads, by profile name.
+    """
+    if profiles is None:
+        profiles = {'default': dict(), 'tuned': TUNED_PRAGMAS}
+    previous = dict(_PROFILE)
+    alias = 'mudslide_bench'
+    results = dict()
+    try:
+        for name, pragmas in profiles.items():
+            install_profile({'pragmas': pragmas})
+            with tempfile.TemporaryDirectory() as tmp:
+                settings = copy.deepcopy(connections.databases['default'])
+                settings.update(ENGINE='django.db.backends.sqlite3', NAME=os.path.join(tmp, 'bench.sqlite3'))
+                connections.databases[alias] = settings
+                try:
+                    conn = connections[alias]
+                    with conn.cursor() as cursor:
+                        cursor.execute("PRAGMA journal_mode")
+                        journal = cursor.fetchone()[0]
+                        cursor.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, name TEXT, value TEXT)")
+                    started = time.perf_counter()
+                    for i in range(writes):
+                        with transaction.atomic(using=alias), conn.cursor() as cursor:
+                            cursor.execute("INSERT INTO bench (name, value) VALUES (%s, %s)",
+                                           (f"name{i}", '{"x": 1}'))
+                    written = time.perf_counter()
+                    with conn.cursor() as cursor:
+                        for i in range(reads):
+                            cursor.execute("SELECT name, value FROM bench WHERE id=%s", (i % writes + 1,))
+                            cursor.fetchone()
+                    done = time.perf_counter()
+                finally:
+                    connections[alias].close()
+                    del connections[alias]
+                    del connections.databases[alias]
+            results[name] = {'writes': written - started, 'reads': done - written}
+            print(f"{name} (journal {journal}): {writes} writes {(written - started) * 1000:.1f}ms "
+                  f"({writes / (written - started):.0f}/s), {reads} reads {(done - written) * 1000:.1f}ms "
+                  f"({reads / (done - written):.0f}/s)")
+    finally:
+        install_profile(previous)
+    return results
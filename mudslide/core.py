@@ -15,9 +15,15 @@ class BaseConfig(HonahleeConfig):
         self.django_settings_final = None
         self.hyper_config = HyperConfig()
         self.user_options = dict()
+        # Which of sqlite_profiles the database uses.
+        self.sqlite_profile = 'tuned'
+        self.sqlite_profiles = dict()
+        # Size of the thread pool that database reads run on.
+        self.db_threads = 4
 
     def setup(self):
         super().setup()
+        self._config_sqlite()
         self._config_django()
         self._config_ansi()
         self._init_django()
@@ -28,6 +34,7 @@ class BaseConfig(HonahleeConfig):
     def _config_classes(self):
         super()._config_classes()
         # Services
+        self.classes['services']['database'] = 'mudslide.services.database.DatabaseService'
         self.classes['services']['connect_screen'] = 'mudslide.services.conscreen.ConnectScreenService'
         self.classes['services']['connections'] = 'mudslide.services.connections.ConnectionService'
         self.classes['services']['web'] = 'mudslide.services.web.WebService'
@@ -35,6 +42,9 @@ class BaseConfig(HonahleeConfig):
         self.classes['services']['entity'] = 'mudslide.services.entity.EntityService'
         self.classes['services']['account'] = 'mudslide.services.account.AccountService'
         self.classes['services']['game'] = 'mudslide.services.game.GameService'
+        self.classes['services']['option'] = 'mudslide.services.option.OptionService'
+        self.classes['services']['access'] = 'mudslide.services.access.AccessService'
+        self.classes['services']['attribute'] = 'mudslide.services.attribute.AttributeService'
 
         # Backends
         self.classes['backends']['account'] = 'mudslide.services.account.AccountBackend'
@@ -55,6 +65,7 @@ class BaseConfig(HonahleeConfig):
 
         # Listeners
         self.classes['listeners']['python'] = 'mudslide.utils.listeners.PythonConsoleListener'
+        self.classes['listeners']['pager'] = 'mudslide.utils.listeners.PagerListener'
 
         # Login Commands
         self.classes['commands_login']['connect'] = 'mudslide.commands.login.ConnectCommand'
@@ -72,6 +83,20 @@ class BaseConfig(HonahleeConfig):
         self.classes['mudslide']['styler'] = 'mudslide.utils.styling.Styler'
         self.classes['mudslide']['option'] = 'mudslide.utils.options.OptionHandler'
 
+        # Option types
+        self.classes['options']['Text'] = 'mudslide.utils.options.Text'
+        self.classes['options']['Email'] = 'mudslide.utils.options.Email'
+        self.classes['options']['Boolean'] = 'mudslide.utils.options.Boolean'
+        self.classes['options']['Color'] = 'mudslide.utils.options.Color'
+        self.classes['options']['Timezone'] = 'mudslide.utils.options.Timezone'
+        self.classes['options']['UnsignedInteger'] = 'mudslide.utils.options.UnsignedInteger'
+        self.classes['options']['SignedInteger'] = 'mudslide.utils.options.SignedInteger'
+        self.classes['options']['PositiveInteger'] = 'mudslide.utils.options.PositiveInteger'
+        self.classes['options']['Duration'] = 'mudslide.utils.options.Duration'
+        self.classes['options']['Datetime'] = 'mudslide.utils.options.Datetime'
+        self.classes['options']['Future'] = 'mudslide.utils.options.Future'
+        self.classes['options']['Lock'] = 'mudslide.utils.options.Lock'
+
     def _config_django(self):
         d = self.django_settings
 
@@ -124,9 +149,16 @@ class BaseConfig(HonahleeConfig):
                 "PASSWORD": "",
                 "HOST": "",
                 "PORT": "",
+                "CONN_MAX_AGE": self.sqlite_profiles[self.sqlite_profile]['conn_max_age'],
             }
         }
 
+    def _config_sqlite(self):
+        from mudslide.utils.sqlite import TUNED_PRAGMAS
+        # Connections are kept open forever when conn_max_age is None.
+        self.sqlite_profiles['default'] = {'pragmas': dict(), 'conn_max_age': 0}
+        self.sqlite_profiles['tuned'] = {'pragmas': dict(TUNED_PRAGMAS), 'conn_max_age': None}
+
     def _config_ansi(self):
         from mudslide.settings import settings as ansi_settings
         pass
@@ -137,6 +169,8 @@ class BaseConfig(HonahleeConfig):
         settings.configure(**self.django_settings)
         self.django_settings_final = settings
         django.setup()
+        from mudslide.utils.sqlite import install_profile
+        install_profile(self.sqlite_profiles[self.sqlite_profile])
 
     def _config_servers(self):
         self.servers['telnet'] = {
@@ -163,4 +197,15 @@ class BaseConfig(HonahleeConfig):
         self.regex['entity_name'] = re.compile(r"^(\w+|\.|-|')+( (\w+|\.|-|')+)*$")
 
     def _config_user_options(self):
-        pass
+        self.user_options['border_color'] = {'class': 'Color', 'description': 'Headers, footers, table borders, etc.', 'default': 'n'}
+        self.user_options['column_names_color'] = {'class': 'Color', 'description': 'Table column header text.', 'default': 'G'}
+        self.user_options['header_text_color'] = {'class': 'Color', 'description': 'Text inside Header lines.', 'default': 'w'}
+        self.user_options['header_star_color'] = {'class': 'Color', 'description': '* inside Header lines.', 'default': 'm'}
+        self.user_options['header_fill'] = {'class': 'Text', 'description': 'Fill for Header lines.', 'default': '='}
+        self.user_options['separator_text_color'] = {'class': 'Color', 'description': 'Text inside Separator lines.', 'default': 'w'}
+        self.user_options['separator_star_color'] = {'class': 'Color', 'description': '* inside Separator lines.', 'default': 'm'}
+        self.user_options['separator_fill'] = {'class': 'Text', 'description': 'Fill for Separator lines.', 'default': '-'}
+        self.user_options['footer_text_color'] = {'class': 'Color', 'description': 'Text inside Footer lines.', 'default': 'w'}
+        self.user_options['footer_star_color'] = {'class': 'Color', 'description': '* inside Footer lines.', 'default': 'm'}
+        self.user_options['footer_fill'] = {'class': 'Text', 'description': 'Fill for Footer lines.', 'default': '='}
+        self.user_options['timezone'] = {'class': 'Timezone', 'description': 'Timezone for dates.', 'default': 'UTC'}
@@ -1,32 +1,111 @@
+import asyncio
+
+from honahlee.utils.time import utcnow
+from mudslide.models import Account
 from . base import BaseEntity
 
 
 class AccountEntity(BaseEntity):
+    __slots__ = ('staff', 'superuser', '_account_model', 'options', 'options_loaded')
     name_type = 'account'
+    component = 'account_component'
 
     def __init__(self, model):
         super().__init__(model)
-        self.account_model = model.account_component
+        # the Account model is loaded with the entity, and kept, as logging in needs it.
+        self._account_model = None
+        self.refresh_account(model.account_component)
         self.options = dict()
+        self.options_loaded = False
+
+    @property
+    def account_model(self):
+        if self._account_model is None:
+            self._account_model = self.model.account_component
+        return self._account_model
 
     def rename(self, new_name):
         """
         Account Entities also have to rename the Account
         model.
         """
-        pass
+        old_name, new_name = super().rename(new_name)
+        self.app.services['database'].submit(Account.objects.filter(pk=self.pk).update, username=new_name)
+        if self._account_model is not None:
+            self._account_model.username = new_name
+        return old_name, new_name
+
+    def refresh_account(self, account):
+        """
+        Keep the Account model and copy its staff and superuser flags. This is called
+        whenever an Account is saved, so neither goes stale.
+
+        Args:
+            account (Account): This entity's Account model.
+        """
+        self._account_model = account
+        self.staff = account.is_staff
+        self.superuser = account.is_superuser
 
     def is_staff(self):
-        return self.account_model.is_staff or self.is_superuser()
+        return self.staff or self.is_superuser()
 
     def is_superuser(self):
-        return self.account_model.is_superuser
+        return self.superuser
+
+    async def render_list_section(self, viewer, styling, loaders):
+        """
+        Render this account's lines of an account listing.
+
+        Args:
+            viewer (AsyncGameConsumerMixin): The connection viewing it.
+            styling (Styler): The viewer's Styler.
+            loaders (dict): DataLoaders from AccountService.list_loaders().
+
+        Returns:
+            lines (list): The lines.
+        """
+        account, bans, last_login, players = await asyncio.gather(
+            *[loaders[name].load(self.pk) for name in ('account', 'bans', 'last_login', 'players')])
+        time_format = styling.time_formats['standard']
+        lines = [styling.styled_separator(self.name)]
+        flags = [flag for flag, held in (('SUPERUSER', self.superuser), ('STAFF', self.staff)) if held]
+        if account:
+            joined = styling.localize_timestring(account.date_joined, time_format=time_format)
+            lines.append(f"Email: {account.email or 'None'} | Joined: {joined}")
+        if last_login:
+            lines.append(f"Last Login: {styling.localize_timestring(last_login, time_format=time_format)}")
+        if (active := [ban for ban in bans if ban.date_expires > utcnow()]):
+            expires = styling.localize_timestring(active[0].date_expires, time_format=time_format)
+            flags.append(f"BANNED until {expires}")
+        lines.append(f"Players: {len(players)} | Bans: {len(bans)}" + (f" | {', '.join(flags)}" if flags else ''))
+        return lines
 
     def render_examine(self, viewer):
         return "NOT YET IMPLEMENTED!"
 
+    def load_options(self, rows):
+        """
+        Load all saved option values.
+
+        Args:
+            rows (dict): The saved values by option name, from the attribute service.
+        """
+        srv = self.app.services['option']
+        values = dict()
+        for name, data in rows.items():
+            if not (option := srv.options.get(name, None)):
+                continue
+            try:
+                values[name] = option.deserialize(data)
+            except ValueError:
+                continue
+        self.options = values
+        self.options_loaded = True
+
     def save_option(self, option, serialized):
-        pass
+        self.options[option.key] = option.deserialize(serialized)
+        self.app.services['option'].queue_save(self, option.key, serialized)
 
     def get_option(self, option):
-        pass
+        return self.options.get(option.key, option.default)
@@ -1,22 +1,51 @@
-from honahlee.utils.time import utcnow
+import sys
+from uuid import UUID
+
+from mudslide.models import Attribute, Entity
+
 
 class BaseEntity:
+    """
+    Entities are kept compact, as there can be very many of them: they use __slots__, store
+    the uuid as an int and the name interned, and don't hold on to their Django model. The
+    model is loaded again when something needs it, such as writing Attributes.
+    """
+    __slots__ = ('pk', '_uuid', 'name', 'type_id', '_model', '__weakref__')
     app = None
     name_type = None
     access_modes = ()
+    # The component model this entity reads in its constructor, for select_related.
+    component = None
 
     def __init__(self, model):
-        self.model = model
-        self.uuid = model.uuid
-        self.name = model.name
-        self.iname = model.iname
+        self._model = None
+        self._uuid = model.uuid.int
+        self.name = sys.intern(model.name)
         self.pk = model.pk
+        self.type_id = model.entity_type_id
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def uuid(self):
+        return UUID(int=self._uuid)
+
+    @property
+    def iname(self):
+        return self.name.lower()
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = Entity.objects.get(pk=self.pk)
+        return self._model
 
     def setup(self):
         pass
 
     def rename(self, new_name):
-        pass
+        return self.app.services['entity'].rename_entity(self, new_name)
 
     def owner(self):
         return self
@@ -27,31 +56,13 @@ class BaseEntity:
         """
         if self.owner() == accessor:
             return True
-        if self.access_check(accessor, perm, True):
-            return False
-        return self.access_check(accessor, perm, False)
+        return self.app.services['access'].check(self, accessor, perm)
 
     def access_check(self, accessor, perm, deny):
         """
-        Does the hard work of actually checking ACL's.
+        Checks if any of the deny or allow ACL entries grant perm to accessor.
         """
-        perms = set()
-        srv_ent = self.app.services['entity']
-
-        for entry in self.model.sacl_entries.filter(deny=deny):
-            spec_ent = srv_ent.get_special(entry.grantee)
-            if spec_ent.represents(accessor, entry.mode):
-                perms += set([p.name for p in entry.permissions.all()])
-                if perm in perms:
-                    return True
-
-        for entry in self.model.acl_entries.filter(deny=deny):
-            ent = entry.grantee
-            if ent.represents(accessor, entry.mode):
-                perms += set([p.name for p in entry.permissions.all()])
-                if perm in perms:
-                    return True
-        return False
+        return self.app.services['access'].check(self, accessor, perm, deny=deny)
 
     def represents(self, accessor, mode):
         """
@@ -67,16 +78,40 @@ class BaseEntity:
         return accessor == self
 
     def get_attribute(self, category, name, default=None, return_obj=False):
-        if not (found := self.model.attributes.filter(category=category, name=name).first()):
-            return default
+        """
+        Get an Attribute's value, or its model with return_obj. This hits the database if
+        the category isn't cached, and return_obj waits for dirty Attributes to be written,
+        so it's only for code off the event loop; on the loop, await fetch_attribute().
+        """
+        srv = self.app.services['attribute']
         if return_obj:
-            return found
-        else:
-            return found.value
+            if (self.pk, category, name) in srv.dirty:
+                srv.write_dirty()
+            found = Attribute.objects.filter(entity_id=self.pk, category=category, name=name).first()
+            return found if found else default
+        return srv.get(self.pk, category, name, default)
+
+    async def fetch_attribute(self, category, name, default=None, return_obj=False):
+        """
+        Get an Attribute without blocking the event loop.
+
+        Args:
+            category (str): The category.
+            name (str): The Attribute's name.
+            default (any, optional): Returned if there is no such Attribute.
+            return_obj (bool): Return the Attribute model rather than its value.
+
+        Returns:
+            value (any): The value, the Attribute, or default.
+        """
+        srv = self.app.services['attribute']
+        if not return_obj:
+            return (await srv.fetch(self.pk, category)).get(name, default)
+        await srv.flush()
+        # read on the writer, so it comes after any write of it that's still committing.
+        found = await self.app.services['database'].write(
+            Attribute.objects.filter(entity_id=self.pk, category=category, name=name).first)
+        return found if found else default
 
     def set_attribute(self, category, name, value):
-        if not (attr := self.model.attributes.filter(category=category, name=name).first()):
-            attr = self.model.attributes.create(category=category, name=name, date_created=utcnow(), value=value)
-        else:
-            attr.value = value
-            attr.save()
\ No newline at end of file
+        self.app.services['attribute'].set(self.pk, category, name, value)
@@ -1,11 +1,21 @@
+import sys
+
 from . base import BaseEntity
 
 
 class GameEntity(BaseEntity):
+    __slots__ = ('game_key', '_game_model')
     name_type = 'game'
+    component = 'game_component'
     access_modes = ('play', 'manage')
 
     def __init__(self, model):
         super().__init__(model)
-        self.game_model = model.game_component
-        self.game_key = self.game_model.game_key
+        self.game_key = sys.intern(model.game_component.game_key)
+        self._game_model = None
+
+    @property
+    def game_model(self):
+        if self._game_model is None:
+            self._game_model = self.model.game_component
+        return self._game_model
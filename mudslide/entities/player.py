@@ -2,9 +2,17 @@ from . base import BaseEntity
 
 
 class PlayerEntity(BaseEntity):
+    __slots__ = ('player_key', '_player_model')
     name_type = 'player'
+    component = 'player_component'
 
     def __init__(self, model):
         super().__init__(model)
-        self.player_model = model.player_component
-        self.player_key = self.player_model.player_key
+        self.player_key = model.player_component.player_key
+        self._player_model = None
+
+    @property
+    def player_model(self):
+        if self._player_model is None:
+            self._player_model = self.model.player_component
+        return self._player_model
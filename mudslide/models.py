@@ -28,6 +28,9 @@ class Entity(models.Model):
     name = models.CharField(max_length=255, null=False, blank=False)
     iname = models.CharField(max_length=255, null=False, blank=False)
 
+    class Meta:
+        indexes = [models.Index(fields=['entity_type', 'iname'])]
+
 
 class BanEntry(models.Model):
     """
@@ -1,6 +1,8 @@
 from channels.consumer import StopConsumer
 from channels.auth import login, logout
 from honahlee.utils.misc import lazy_property
+from mudslide.settings import settings
+from mudslide.utils.ansi import parse_ansi
 
 
 class AsyncGameConsumerMixin:
@@ -24,7 +26,6 @@ class AsyncGameConsumerMixin:
         self.logged_in = None
         self.conn_id = None
         self.account = None
-        self.options = dict()
 
     async def game_login(self, account):
         """
@@ -36,6 +37,10 @@ class AsyncGameConsumerMixin:
         await login(self.scope, account.account_model)
         self.logged_in = True
         self.account = account
+        self.app.services['entity'].pin(account)
+        # the account's options now apply.
+        await self.options.load()
+        self.styling.invalidate_theme()
         await self.at_game_login()
 
     async def at_game_login(self):
@@ -46,8 +51,11 @@ class AsyncGameConsumerMixin:
 
     async def game_logout(self):
         await logout(self.scope)
+        if self.account:
+            self.app.services['entity'].unpin(self.account)
         self.logged_in = False
         self.account = None
+        self.styling.invalidate_theme()
 
     async def game_close(self, reason):
         """
@@ -101,6 +109,70 @@ class AsyncGameConsumerMixin:
             'data': text
         })
 
+    async def page(self, source, page_size=None):
+        """
+        Shows long output to this connection one page at a time.
+
+        Args:
+            source (callable): Returns an iterable of lines, like `lambda: table.stream(rows)`. It may
+                be called more than once, and should start over each time.
+            page_size (int, optional): Lines per page. Defaults to the client's screen height.
+        """
+        pager = self.app.classes['listeners']['pager'](self, source, page_size=page_size)
+        await self.app.services['input'].start_listener(self, pager)
+
+    def render_fingerprint(self):
+        """
+        Describes everything that decides what bytes text turns into for this connection, styling
+        options included. Connections with equal fingerprints get identical output for identical text,
+        which lets broadcasts render once per fingerprint instead of once per connection.
+
+        Returns:
+            fingerprint (tuple): A hashable description of the rendering.
+        """
+        client = self.scope.get('game_client', dict())
+        caps = client.get('capabilities', dict())
+        if not caps.get('ansi', True):
+            color = 'none'
+        elif caps.get('truecolor', False):
+            color = 'truecolor'
+        elif caps.get('xterm256', False):
+            color = 'xterm256'
+        else:
+            color = 'ansi'
+        return (self.scope.get('type', None), color, self.uses_screenreader(),
+                client.get('width', settings.CLIENT_DEFAULT_WIDTH), self.styling.theme.key)
+
+    def render_output(self, text: str) -> bytes:
+        """
+        Renders text into the exact bytes this connection's protocol would send for it. By default
+        that's plain UTF-8 text with the markup stripped and a newline ending; consumers override
+        this for their protocol's encoding.
+
+        Args:
+            text (str): Text with markup.
+
+        Returns:
+            data (bytes): The rendered output.
+        """
+        text = parse_ansi(text, strip_ansi=True)
+        if not text.endswith('\r\n'):
+            text += '\r\n'
+        return text.encode('utf-8')
+
+    def send_rendered(self, data: bytes):
+        """
+        Queues output that was already rendered by render_output(). The same bytes object may be
+        shared by many connections.
+
+        Args:
+            data (bytes): The output.
+        """
+        self.scope['to_protocol'].put_nowait({
+            'type': 'rendered',
+            'data': data
+        })
+
     def is_authenticated(self):
         return self.logged_in
 
@@ -113,7 +185,7 @@ class AsyncGameConsumerMixin:
         return self.scope['user'].is_superuser
 
     def uses_screenreader(self):
-        return False
+        return self.scope.get('game_client', dict()).get('options', dict()).get('screenreader', False)
 
     def get_account(self):
         if self.logged_in:
@@ -1,9 +1,11 @@
+import re
 import zlib
 import asyncio
 
 from channels.consumer import AsyncConsumer
 from honahlee.protocols.base import AsgiAdapterProtocol
 from mudslide.protocols.game import AsyncGameConsumerMixin
+from mudslide.utils.ansi import parse_ansi
 
 # Much of this code has been adapted from the Evennia project https://github.com/evennia/evennia
 # twisted.conch.telnet was also used for inspiration.
@@ -53,6 +55,50 @@ for (name, b) in TCODES.items():
     TCODES_INTS[b] = name
 
 
+# Decorative line art stripped for screenreaders.
+_RE_SCREENREADER = re.compile(r"\+-+|\+$|\+~|--+|~~+|==+", re.MULTILINE)
+
+
+def render_telnet_text(text, game_client):
+    """
+    Renders markup into the escape codes a telnet client can display, as
+    detected by TTYPE/MTTS. Colors the client can't show are downgraded and
+    redundant escape codes are dropped before they hit the wire. Screenreader
+    users get plain text without line art, which would be read out loud.
+
+    Args:
+        text (str): Text with markup.
+        game_client (dict): The client details from the scope.
+
+    Returns:
+        text (str): The rendered text.
+    """
+    if game_client.get("options", dict()).get("screenreader", False):
+        return _RE_SCREENREADER.sub("", parse_ansi(text, strip_ansi=True))
+    caps = game_client["capabilities"]
+    return parse_ansi(text, strip_ansi=not caps.get("ansi", True), xterm256=caps.get("xterm256", False),
+                      truecolor=caps.get("truecolor", False), minimize=True)
+
+
+def encode_telnet_text(text, game_client):
+    """
+    Renders text and turns it into the exact bytes a telnet client receives
+    for it, newline ending included. Write transforms like MCCP are not
+    applied here, as those are per-connection.
+
+    Args:
+        text (str): Text with markup.
+        game_client (dict): The client details from the scope.
+
+    Returns:
+        data (bytes): The encoded text.
+    """
+    text = render_telnet_text(text, game_client)
+    if not text.endswith('\r\n'):
+        text += '\r\n'
+    return text.encode("ascii")
+
+
 def debug_telnet(data):
     output = b''
     for b in data:
@@ -252,6 +298,7 @@ class TTYPEHandler(TelnetOptionHandler):
     sb = True
 
     MTTS = [
+        (256, "TRUECOLOR"),
         (128, "PROXY"),
         (64, "SCREENREADER"),
         (32, "OSC_COLOR_PALETTE"),
@@ -328,9 +375,13 @@ class TTYPEHandler(TelnetOptionHandler):
                 or tupper.endswith("XTERM")  # Apple Terminal, old Tintin
                 and not tupper.endswith("-COLOR")  # old Tintin, Putty
         )
-        if xterm256:
+        # terminfo names for 24-bit color, such as xterm-direct or konsole-truecolor
+        truecolor = tupper.endswith("-TRUECOLOR") or tupper.endswith("-DIRECT")
+        if xterm256 or truecolor:
             self.protocol.scope["game_client"]["capabilities"]["ansi"] = True
-            self.protocol.scope["game_client"]["capabilities"]["xterm256"] = xterm256
+            self.protocol.scope["game_client"]["capabilities"]["xterm256"] = True
+        if truecolor:
+            self.protocol.scope["game_client"]["capabilities"]["truecolor"] = True
         self.protocol.scope["game_client"]["terminal"] = term
 
     def set_mtts(self, data):
@@ -348,6 +399,9 @@ class TTYPEHandler(TelnetOptionHandler):
                     self.protocol.scope["game_client"]["options"]["screenreader"] = True
                 if "XTERM256" in support:
                     self.protocol.scope["game_client"]["capabilities"]["xterm256"] = True
+                if "TRUECOLOR" in support:
+                    self.protocol.scope["game_client"]["capabilities"]["xterm256"] = True
+                    self.protocol.scope["game_client"]["capabilities"]["truecolor"] = True
                 if "ANSI" in support:
                     self.protocol.scope["game_client"]["capabilities"]["ansi"] = True
                 if "UTF-8" in support:
@@ -757,6 +811,8 @@ class TelnetAsgiProtocol(AsgiAdapterProtocol):
         print(f"PROCESSING EVENT: {event}")
         if event["type"] == "text":
             await self.send_text(event["data"])
+        elif event["type"] == "rendered":
+            await self.send_bytes(event["data"])
         elif event["type"] == "prompt":
             await self.send_prompt(event["data"])
         elif event["type"] == "subnegotiate":
@@ -769,6 +825,18 @@ class TelnetAsgiProtocol(AsgiAdapterProtocol):
         if (callback := event.get('callback', None)):
             callback()
 
+    def render_text(self, text):
+        """
+        Renders markup into the escape codes this client can display.
+
+        Args:
+            text (str): Text with markup.
+
+        Returns:
+            text (str): The rendered text.
+        """
+        return render_telnet_text(text, self.scope["game_client"])
+
     async def send_text(self, text):
         """
         Ensures that text sent to client will have a newline ending.
@@ -776,9 +844,7 @@ class TelnetAsgiProtocol(AsgiAdapterProtocol):
         Args:
             text (str): The utf-8 text to send.
         """
-        if not text.endswith('\r\n'):
-            text += '\r\n'
-        await self.send_bytes(text.encode("ascii"))
+        await self.send_bytes(encode_telnet_text(text, self.scope["game_client"]))
 
     async def send_prompt(self, text):
         """
@@ -788,6 +854,7 @@ class TelnetAsgiProtocol(AsgiAdapterProtocol):
             text (str): The utf-8 text to send.
         """
         prompt = TCODES_BYTES['IAC'] + TCODES_BYTES['GA']
+        text = self.render_text(text)
         if not text.endswith(prompt):
             text += prompt
         await self.send_bytes(text.encode("ascii"))
@@ -816,3 +883,6 @@ class AsyncTelnetConsumer(AsyncConsumer, AsyncGameConsumerMixin):
         # Gotta set this to the same dictionary that's contained in the base
         self.scope["game_client"] = event["data"]
         await self.game_connect()
+
+    def render_output(self, text):
+        return encode_telnet_text(text, self.scope["game_client"])
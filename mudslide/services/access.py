@@ -0,0 +1,255 @@
+from collections import OrderedDict
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from honahlee.core import BaseService
+from mudslide.models import ACLPermission, ACLEntry, SpecialACLEntry
+
+
+class CompiledACL:
+    """
+    The ACL entries of one resource, compiled into permission bitmasks. Each entry becomes a
+    (grantee, mode, mask) triple; entries for the same grantee and mode are merged.
+    """
+    __slots__ = ('deny', 'allow', 'special_deny', 'special_allow')
+
+    def __init__(self):
+        self.deny = tuple()
+        self.allow = tuple()
+        self.special_deny = tuple()
+        self.special_allow = tuple()
+
+
+class AccessService(BaseService):
+    """
+    Answers access checks from compiled ACLs. Every ACLPermission gets a bit, and each
+    resource's entries are compiled into bitmasks on first use and kept until its entries
+    change, so checks on a warm resource do no I/O.
+    """
+    # How many resources' compiled ACLs are kept.
+    cache_size = 20000
+
+    def __init__(self):
+        super().__init__()
+        self.perm_bits = dict()
+        self.compiled = OrderedDict()
+        self.specials = dict()
+
+    def setup(self):
+        self.load_permissions()
+        post_save.connect(self.permission_changed, sender=ACLPermission)
+        for model in (ACLEntry, SpecialACLEntry):
+            post_save.connect(self.entry_changed, sender=model)
+            post_delete.connect(self.entry_changed, sender=model)
+            m2m_changed.connect(self.entry_changed, sender=model.permissions.through)
+
+    def load_permissions(self):
+        self.perm_bits = {name: 1 << pk for pk, name in ACLPermission.objects.values_list('pk', 'name')}
+
+    def permission_changed(self, sender, instance, **kwargs):
+        self.perm_bits[instance.name] = 1 << instance.pk
+
+    def entry_changed(self, sender, instance, **kwargs):
+        if (resource_id := getattr(instance, 'resource_id', None)) is not None:
+            self.invalidate(resource_id)
+
+    def invalidate(self, resource_id):
+        """
+        Forget a resource's compiled ACL, so it's compiled again on next use.
+
+        Args:
+            resource_id (int): The id of the resource Entity.
+        """
+        self.compiled.pop(resource_id, None)
+
+    def register_special(self, number, special):
+        """
+        Register the object answering for a special grantee, like 'Everyone'.
+
+        Args:
+            number (int): The grantee number used in SpecialACLEntry.
+            special (any): An object with a represents(accessor, mode) method.
+        """
+        self.specials[number] = special
+
+    def compile(self, resource_ids):
+        """
+        Compile the ACLs of resources and cache them. This hits the database; on the event
+        loop, use load() instead.
+
+        Args:
+            resource_ids (iterable): Ids of resource Entities.
+
+        Returns:
+            compiled (dict): The CompiledACL of each resource.
+        """
+        return self.store(self.read_acls(resource_ids))
+
+    async def load(self, resource_ids):
+        """
+        Get the compiled ACLs of resources, compiling the ones that aren't cached on the
+        database readers, and fetch the grantees that answer for others, so checks on these
+        resources don't hit the database.
+
+        Args:
+            resource_ids (iterable): Ids of resource Entities.
+
+        Returns:
+            compiled (dict): The CompiledACL of each resource.
+        """
+        resource_ids = set(resource_ids)
+        acls = {pk: acl for pk in resource_ids if (acl := self.compiled.get(pk, None)) is not None}
+        if (missing := [pk for pk in resource_ids if pk not in acls]):
+            acls.update(self.store(await self.app.services['database'].read(self.read_acls, missing)))
+        grantees = {grantee for acl in acls.values() for entries in (acl.deny, acl.allow)
+                    for grantee, mode, mask in entries if mode}
+        if grantees:
+            await self.app.services['entity'].fetch_many(grantees)
+        return acls
+
+    @staticmethod
+    def read_acls(resource_ids):
+        """
+        Compile the ACLs of resources, in two queries no matter how many there are. This
+        touches no service state, so it can run on a database reader.
+
+        Args:
+            resource_ids (iterable): Ids of resource Entities.
+
+        Returns:
+            compiled (dict): The CompiledACL of each resource.
+        """
+        found = {pk: (dict(), dict(), dict(), dict()) for pk in resource_ids}
+        if not found:
+            return dict()
+        for model, offset in ((ACLEntry, 0), (SpecialACLEntry, 2)):
+            through = model.permissions.through
+            rows = through.objects.filter(**{f"{model._meta.model_name}__resource_id__in": list(found)})
+            prefix = model._meta.model_name
+            for resource, grantee, mode, deny, perm in rows.values_list(
+                    f"{prefix}__resource_id", f"{prefix}__grantee", f"{prefix}__mode", f"{prefix}__deny",
+                    'aclpermission_id'):
+                masks = found[resource][offset if deny else offset + 1]
+                masks[(grantee, mode)] = masks.get((grantee, mode), 0) | (1 << perm)
+
+        results = dict()
+        for pk, (deny, allow, special_deny, special_allow) in found.items():
+            acl = CompiledACL()
+            acl.deny = tuple((grantee, mode, mask) for (grantee, mode), mask in deny.items())
+            acl.allow = tuple((grantee, mode, mask) for (grantee, mode), mask in allow.items())
+            acl.special_deny = tuple((grantee, mode, mask) for (grantee, mode), mask in special_deny.items())
+            acl.special_allow = tuple((grantee, mode, mask) for (grantee, mode), mask in special_allow.items())
+            results[pk] = acl
+        return results
+
+    def store(self, compiled):
+        self.compiled.update(compiled)
+        while len(self.compiled) > self.cache_size:
+            self.compiled.popitem(last=False)
+        return compiled
+
+    def get_compiled(self, resource_id):
+        if (acl := self.compiled.get(resource_id, None)) is None:
+            return self.compile((resource_id,))[resource_id]
+        self.compiled.move_to_end(resource_id)
+        return acl
+
+    def matches(self, entries, special_entries, accessor, bit, memo=None):
+        """
+        Check if any entry granting a bit applies to the accessor.
+
+        Args:
+            entries (tuple): Compiled entries.
+            special_entries (tuple): Compiled special entries.
+            accessor (BaseEntity): Who wants access.
+            bit (int): The permission's bit.
+            memo (dict, optional): Remembers which grantees represent the accessor, for
+                checking many resources for the same accessor.
+
+        Grantees that answer for others are only consulted if they're in memory; load()
+        fetches them.
+        """
+        srv_ent = self.app.services['entity']
+        for grantee, mode, mask in special_entries:
+            if not mask & bit:
+                continue
+            key = (True, grantee, mode)
+            if memo is None or (found := memo.get(key, None)) is None:
+                found = bool((special := self.specials.get(grantee, None)) and special.represents(accessor, mode))
+                if memo is not None:
+                    memo[key] = found
+            if found:
+                return True
+        for grantee, mode, mask in entries:
+            if not mask & bit:
+                continue
+            if not mode:
+                # represents_NA, without creating the grantee.
+                if accessor is not None and accessor.pk == grantee:
+                    return True
+                continue
+            key = (False, grantee, mode)
+            if memo is None or (found := memo.get(key, None)) is None:
+                found = bool((ent := srv_ent.get_by_id(grantee)) and ent.represents(accessor, mode))
+                if memo is not None:
+                    memo[key] = found
+            if found:
+                return True
+        return False
+
+    def check(self, resource, accessor, perm, deny=None):
+        """
+        Check if an accessor has a permission on a resource. Deny entries take precedence.
+        On the event loop, await load() for the resource first, so this doesn't hit the
+        database.
+
+        Args:
+            resource (BaseEntity): The resource.
+            accessor (BaseEntity): Who wants access.
+            perm (str): The permission's name.
+            deny (bool, optional): Only check the deny (True) or allow (False) entries.
+
+        Returns:
+            result (bool): If access is granted, or if any entry matched when `deny` is given.
+        """
+        if not (bit := self.perm_bits.get(perm, 0)):
+            return False
+        acl = self.get_compiled(resource.pk)
+        if deny is not None:
+            if deny:
+                return self.matches(acl.deny, acl.special_deny, accessor, bit)
+            return self.matches(acl.allow, acl.special_allow, accessor, bit)
+        if self.matches(acl.deny, acl.special_deny, accessor, bit):
+            return False
+        return self.matches(acl.allow, acl.special_allow, accessor, bit)
+
+    async def filter(self, accessor, resources, perm):
+        """
+        Check a permission on many resources at once. ACLs that aren't compiled yet are
+        compiled together on the database readers, and whether a grantee represents the accessor is only worked
+        out once for all the resources.
+
+        Args:
+            accessor (BaseEntity): Who wants access.
+            resources (iterable): The resources.
+            perm (str): The permission's name.
+
+        Returns:
+            allowed (list): The resources the accessor has the permission on, in order.
+        """
+        resources = list(resources)
+        bit = self.perm_bits.get(perm, 0)
+        acls = await self.load(res.pk for res in resources)
+        memo = dict()
+        allowed = list()
+        for res in resources:
+            if res.owner() == accessor:
+                allowed.append(res)
+                continue
+            if not bit:
+                continue
+            acl = acls[res.pk]
+            if self.matches(acl.deny, acl.special_deny, accessor, bit, memo):
+                continue
+            if self.matches(acl.allow, acl.special_allow, accessor, bit, memo):
+                allowed.append(res)
+        return allowed
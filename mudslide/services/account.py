@@ -1,20 +1,32 @@
+import asyncio
+
 from django.db import transaction, IntegrityError
+from django.db.models import Max
+from django.db.models.signals import post_save
 from honahlee.core import BaseService, BaseBackend
-from mudslide.models import Account
+from mudslide.models import Account, BanEntry, LoginRecord, Player
 from honahlee.utils.time import duration_from_string, utcnow
 from mudslide.utils.text import partial_match, iter_to_string
 from honahlee.utils.misc import make_iter
+from mudslide.utils.dataloader import DataLoader, group_by, key_by
 
 from django.contrib.auth.hashers import (
     check_password, is_password_usable, make_password,
 )
-from channels.db import database_sync_to_async
 from datetime import timedelta
 
 
 class AccountService(BaseService):
     backend_key = 'account'
 
+    def setup(self):
+        post_save.connect(self.account_saved, sender=Account)
+
+    def account_saved(self, sender, instance, **kwargs):
+        # keeps the model AccountEntity holds and its flags current, whoever saved it.
+        if (ent := self.app.services['entity'].live.get(instance.pk, None)) is not None:
+            ent.refresh_account(instance)
+
     async def create_account(self, connection, username, password):
         account = await self.backend.async_create_account(username, password)
         self.app.config.logs['application'].info(f"CONNECTION: {connection} - Account Created: {account}")
@@ -131,7 +143,7 @@ class AccountService(BaseService):
         perm_data = settings.PERMISSIONS.get(perm, dict())
         perm_lock = perm_data.get("permission", None)
         if not perm_lock:
-            if not enactor.is_superuser:
+            if not enactor.is_superuser():
                 raise ValueError("Permission denied. Only a Superuser can grant this.")
         if perm_lock:
             passed = False
@@ -155,7 +167,7 @@ class AccountService(BaseService):
         perm_data = settings.PERMISSIONS.get(perm, dict())
         perm_lock = perm_data.get("permission", None)
         if not perm_lock:
-            if not enactor.is_superuser:
+            if not enactor.is_superuser():
                 raise ValueError("Permission denied. Only a Superuser can grant this.")
         if perm_lock:
             passed = False
@@ -172,10 +184,12 @@ class AccountService(BaseService):
         # amsg.RevokeMessage(entities, perm=perm).send()
 
     async def toggle_super(self, session, account):
-        if not (enactor := session.get_account()) or not enactor.is_superuser:
+        if not (enactor := session.get_account()) or not enactor.is_superuser():
             raise ValueError("Permission denied.")
         account = await self.find_account(account)
-        acc_super = account.is_superuser
+        database = self.app.services['database']
+        model = account.account_model
+        acc_super = model.is_superuser
         reverse = not acc_super
         entities = {'enactor': enactor, 'account': account}
         if acc_super:
@@ -184,8 +198,9 @@ class AccountService(BaseService):
         else:
             pass
             # amsg.GrantSuperMessage(entities).send()
-        account.is_superuser = reverse
-        account.save(update_fields=['is_superuser'])
+        model.is_superuser = reverse
+        await database.write(model.save, update_fields=['is_superuser'])
+        account.superuser = reverse
         if reverse:
             self.permissions["_super"].add(account)
         else:
@@ -200,7 +215,7 @@ class AccountService(BaseService):
         message = list()
         message.append(styling.styled_header(f"Access Levels: {account}"))
         message.append(f"PERMISSION HIERARCHY: {iter_to_string(settings.PERMISSION_HIERARCHY)} <<<< SUPERUSER")
-        message.append(f"HELD PERMISSIONS: {iter_to_string(account.permissions.all())} ; SUPERUSER: {account.is_superuser}")
+        message.append(f"HELD PERMISSIONS: {iter_to_string(account.permissions.all())} ; SUPERUSER: {account.is_superuser()}")
         message.append(styling.blank_footer)
         return '\n'.join(str(l) for l in message)
 
@@ -252,12 +267,35 @@ class AccountService(BaseService):
             pass
         else:
             styling = connection.styler
+            loaders = self.list_loaders()
+            sections = await asyncio.gather(*[acc.render_list_section(connection, styling, loaders)
+                                              for acc in accounts])
             message.append(styling.styled_header(f"Account Listing"))
-            for acc in accounts:
-                message.extend(acc.render_list_section(connection, styling))
+            for section in sections:
+                message.extend(section)
             message.append(styling.styled_footer())
         return '\n'.join(str(l) for l in message)
 
+    def list_loaders(self):
+        """
+        Make the DataLoaders that account renders use for related rows, so rendering many
+        accounts costs one query per kind of row instead of one per account.
+
+        Returns:
+            loaders (dict): DataLoaders by name, all keyed by account Entity id.
+        """
+        read = self.app.services['database'].read
+        return {
+            'account': DataLoader(key_by(Account.objects.all()), read),
+            'bans': DataLoader(group_by(BanEntry.objects.order_by('-date_expires'), 'entity_id'), read, list),
+            'last_login': DataLoader(self.batch_last_login, read),
+            'players': DataLoader(group_by(Player.objects.all(), 'account_id'), read, list),
+        }
+
+    def batch_last_login(self, keys):
+        rows = LoginRecord.objects.filter(entity_id__in=keys, success=True).values('entity_id')
+        return {row['entity_id']: row['last'] for row in rows.annotate(last=Max('date_created'))}
+
     async def examine_account(self, connection, account):
         if not (conn_account := connection.get_account()):
             raise ValueError("Permission denied.")
@@ -285,27 +323,66 @@ class AccountBackend(BaseBackend):
     def __init__(self, service):
         super().__init__(service)
 
-    @database_sync_to_async
-    def async_create_account(self, username, password, email=None, entity=None):
-        return self.create_account(username, password, email, entity)
+    async def all(self):
+        return await self.app.services['entity'].all_of_type('account')
 
-    def create_account(self, username, password, email=None, entity=None):
+    async def count(self):
+        return self.app.services['entity'].count_of_type('account')
+
+    async def find_account(self, search_text, exact=False):
         """
-        This is called after all verification on username and password is done.
+        Find an account by name, using the entity name index. An exact name always wins,
+        otherwise a unique partial match is accepted unless `exact` is set.
         """
         ent_srv = self.app.services['entity']
-        cls = ent_srv.type_map['account']
+        if (found := await ent_srv.find_name('account', search_text)):
+            return found
+        if not exact:
+            candidates = await ent_srv.search_names('account', search_text, limit=10)
+            if len(candidates) == 1:
+                return candidates[0]
+            if candidates:
+                raise ValueError(f"That matched: {iter_to_string(candidates)}. Please be more specific!")
+        raise ValueError(f"Account '{search_text}' not found!")
 
+    async def async_create_account(self, username, password, email=None, entity=None):
+        model = await self.app.services['database'].write(self.create_account_model, username, password, email,
+                                                          entity)
+        return self.register_account(model)
+
+    def create_account(self, username, password, email=None, entity=None):
+        """
+        Create an account right here. This blocks, so on the event loop await
+        async_create_account() instead.
+        """
+        return self.register_account(self.create_account_model(username, password, email, entity))
+
+    def create_account_model(self, username, password, email=None, entity=None):
+        """
+        This is called after all verification on username and password is done. It only
+        writes the rows, so it runs on the database writer; the entity is made from the
+        model it returns by register_account(), back on the event loop.
+
+        Returns:
+            model (Entity or None): The account's Entity model, or None if it couldn't be made.
+        """
+        ent_srv = self.app.services['entity']
         try:
             with transaction.atomic():
                 if not entity:
                     entity = ent_srv.create_model('account', username)
                 Account.objects.create(id=entity, username=username, password=make_password(password),
-                                                     email=email, date_joined=entity.date_created,
-                                                     total_playtime=timedelta())
-                new_ent = cls(entity)
-            ent_srv.register_entity(new_ent)
-            return new_ent
+                                       email=email, date_joined=entity.date_created,
+                                       total_playtime=timedelta())
+            return entity
         except IntegrityError as e:
             print(e)
-            pass
+            return None
+
+    def register_account(self, model):
+        if model is None:
+            return None
+        ent_srv = self.app.services['entity']
+        new_ent = ent_srv.type_map['account'](model)
+        ent_srv.register_entity(new_ent, model.entity_type)
+        return new_ent
@@ -0,0 +1,296 @@
+import asyncio
+
+from django.db import transaction
+from honahlee.core import BaseService
+from honahlee.utils.time import utcnow
+from mudslide.models import Attribute
+
+
+class AttributeService(BaseService):
+    """
+    Caches Entity Attributes. An entity's Attributes are loaded a category at a time, reads
+    are served from memory, and writes are only marked dirty. Dirty Attributes of all
+    entities are written together shortly after, in one transaction.
+
+    The cache is only changed on the thread that owns the service, the event loop once it
+    runs: the database threads just run queries and hand rows back. An entity's cached
+    Attributes are dropped when it leaves the entity service's resident set.
+    """
+    # Seconds to wait after a write before flushing, so nearby writes are batched.
+    flush_interval = 1.0
+    # Times flush() tries a write that keeps failing before giving up on it for now.
+    flush_attempts = 3
+
+    def __init__(self):
+        super().__init__()
+        # (entity_id, category) -> {name: value}
+        self.cache = dict()
+        # (entity_id, category) -> {name: Attribute id}, for rows that are known to exist.
+        self.ids = dict()
+        # entity_id -> categories in cache or ids, so an entity's entries can be evicted.
+        self.categories = dict()
+        # (entity_id, category, name) -> value
+        self.dirty = dict()
+        # Dirty values taken by a write that hasn't committed yet.
+        self.writing = dict()
+        self.flush_task = None
+
+    def load(self, entity_id, category):
+        """
+        Load all of an entity's Attributes in a category, if they aren't cached. This hits
+        the database when they aren't, so on the event loop await fetch() instead.
+
+        Args:
+            entity_id (int): The Entity's id.
+            category (str): The category.
+
+        Returns:
+            values (dict): The Attribute values by name. Don't modify this.
+        """
+        if (values := self.cache.get((entity_id, category), None)) is not None:
+            return values
+        return self.store(entity_id, category, self.read_rows(entity_id, category))
+
+    async def fetch(self, entity_id, category):
+        """
+        Like load(), but querying on the database readers.
+
+        Args:
+            entity_id (int): The Entity's id.
+            category (str): The category.
+
+        Returns:
+            values (dict): The Attribute values by name. Don't modify this.
+        """
+        if (values := self.cache.get((entity_id, category), None)) is not None:
+            return values
+        rows = await self.app.services['database'].read(self.read_rows, entity_id, category)
+        return self.store(entity_id, category, rows)
+
+    @staticmethod
+    def read_rows(entity_id, category):
+        return list(Attribute.objects.filter(entity_id=entity_id, category=category).values_list(
+            'pk', 'name', 'value'))
+
+    def store(self, entity_id, category, rows):
+        """
+        Cache an entity's Attributes in a category, from rows read by read_rows().
+
+        Returns:
+            values (dict): The Attribute values by name.
+        """
+        if (values := self.cache.get((entity_id, category), None)) is not None:
+            # loaded by someone else while these rows were read.
+            return values
+        values = dict()
+        ids = self.ids.setdefault((entity_id, category), dict())
+        for pk, name, value in rows:
+            ids[name] = pk
+            values[name] = value
+        # writes made before it was loaded are newer than what's stored.
+        for pending in (self.writing, self.dirty):
+            for (ent, cat, name), value in pending.items():
+                if ent == entity_id and cat == category:
+                    values[name] = value
+        self.cache[(entity_id, category)] = values
+        self.categories.setdefault(entity_id, set()).add(category)
+        return values
+
+    def get(self, entity_id, category, name, default=None):
+        # loads the category if needed, so off the event loop only. see fetch().
+        return self.load(entity_id, category).get(name, default)
+
+    def set(self, entity_id, category, name, value):
+        """
+        Set an Attribute's value. It's written to the database on the next flush.
+
+        Args:
+            entity_id (int): The Entity's id.
+            category (str): The category.
+            name (str): The Attribute's name.
+            value (any): The JSON-ready value.
+        """
+        if (values := self.cache.get((entity_id, category), None)) is not None:
+            values[name] = value
+        self.dirty[(entity_id, category, name)] = value
+        self.schedule_flush()
+
+    def evict(self, entity_id):
+        """
+        Drop an entity's cached Attributes, such as when it stops being resident. Dirty
+        Attributes are kept, and still written on the next flush.
+
+        Args:
+            entity_id (int): The Entity's id.
+        """
+        for category in self.categories.pop(entity_id, ()):
+            self.cache.pop((entity_id, category), None)
+            self.ids.pop((entity_id, category), None)
+
+    def forget(self, entity_id):
+        """
+        Drop everything cached for an entity, such as when it's deleted. Unflushed writes
+        are lost.
+
+        Args:
+            entity_id (int): The Entity's id.
+        """
+        self.evict(entity_id)
+        for key in [key for key in self.dirty if key[0] == entity_id]:
+            del self.dirty[key]
+
+    def schedule_flush(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # no event loop, such as in a shell. just write it.
+            self.write_dirty()
+            return
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.ensure_future(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """
+        Write all dirty Attributes now. Await this when the data must be durable. A write
+        that fails flush_attempts times in a row is logged and left dirty, to be tried
+        again by the next flush.
+
+        Returns:
+            flushed (bool): If everything dirty was written.
+        """
+        failures = 0
+        while self.dirty:
+            dirty, known = self.take_dirty()
+            try:
+                found = await self.app.services['database'].write(self.write_rows, dirty, known)
+            except Exception as err:
+                self.finish_write(dirty, False)
+                if (failures := failures + 1) >= self.flush_attempts:
+                    self.app.config.logs['application'].error(
+                        f"Could not write {len(dirty)} Attributes after {failures} attempts: {err}")
+                    return False
+                await asyncio.sleep(self.flush_interval)
+                continue
+            self.finish_write(dirty, True, found)
+            failures = 0
+        return True
+
+    def write_dirty(self):
+        """
+        Write all dirty Attributes on the database writer, and wait until they are. This
+        blocks, so on the event loop await flush() instead.
+
+        Returns:
+            count (int): How many Attributes were written.
+        """
+        dirty, known = self.take_dirty()
+        if not dirty:
+            return 0
+        try:
+            found = self.app.services['database'].submit(self.write_rows, dirty, known).result()
+        except Exception:
+            self.finish_write(dirty, False)
+            raise
+        self.finish_write(dirty, True, found)
+        return len(dirty)
+
+    def take_dirty(self):
+        """
+        Take the dirty Attributes to write them, along with the ids of the ones already
+        known to exist.
+
+        Returns:
+            dirty (dict): Values by (entity_id, category, name).
+            known (dict): Attribute ids by (entity_id, category, name).
+        """
+        dirty, self.dirty = self.dirty, dict()
+        self.writing.update(dirty)
+        known = dict()
+        for key in dirty:
+            if (pk := self.ids.get(key[:2], dict()).get(key[2], None)) is not None:
+                known[key] = pk
+        return dirty, known
+
+    def finish_write(self, dirty, written, found=None):
+        """
+        Settle the Attributes taken by take_dirty(), once their write is done.
+
+        Args:
+            dirty (dict): The Attributes that were being written.
+            written (bool): If the write committed. If not, they are dirty again.
+            found (dict, optional): Attribute ids by key, from write_rows().
+        """
+        for key, value in dirty.items():
+            if self.writing.get(key, None) is value:
+                del self.writing[key]
+            if not written:
+                # put it back, unless it's been written again since.
+                self.dirty.setdefault(key, value)
+        for (entity_id, category, name), pk in (found or dict()).items():
+            self.ids.setdefault((entity_id, category), dict())[name] = pk
+            self.categories.setdefault(entity_id, set()).add(category)
+
+    @classmethod
+    def write_rows(cls, dirty, known):
+        """
+        Write Attributes in one transaction. This only queries and touches no service state,
+        so it runs on the database writer.
+
+        Args:
+            dirty (dict): Values by (entity_id, category, name).
+            known (dict): Attribute ids by (entity_id, category, name), for rows that exist.
+
+        Returns:
+            ids (dict): The Attribute id of every key written.
+        """
+        ids = dict(known)
+        with transaction.atomic():
+            ids.update(cls.find_ids([key for key in dirty if key not in ids]))
+            updates = list()
+            creates = list()
+            now = utcnow()
+            for key, value in dirty.items():
+                entity_id, category, name = key
+                if (pk := ids.get(key, None)) is not None:
+                    updates.append(Attribute(pk=pk, entity_id=entity_id, category=category, name=name,
+                                             value=value))
+                else:
+                    creates.append(Attribute(entity_id=entity_id, category=category, name=name, value=value,
+                                             date_created=now))
+            if updates:
+                Attribute.objects.bulk_update(updates, ['value'])
+            if creates:
+                Attribute.objects.bulk_create(creates)
+        if creates:
+            if all(attr.pk is not None for attr in creates):
+                for attr in creates:
+                    ids[(attr.entity_id, attr.category, attr.name)] = attr.pk
+            else:
+                ids.update(cls.find_ids([(attr.entity_id, attr.category, attr.name) for attr in creates]))
+        return ids
+
+    @staticmethod
+    def find_ids(keys):
+        """
+        Look up the ids of Attributes that may already exist, in one query.
+
+        Args:
+            keys (list): (entity_id, category, name) tuples.
+
+        Returns:
+            ids (dict): The Attribute id of each key that exists.
+        """
+        if not keys:
+            return dict()
+        wanted = set(keys)
+        found = dict()
+        rows = Attribute.objects.filter(entity_id__in={key[0] for key in keys}, category__in={key[1] for key in keys},
+                                        name__in={key[2] for key in keys})
+        for pk, entity_id, category, name in rows.values_list('pk', 'entity_id', 'category', 'name'):
+            if (key := (entity_id, category, name)) in wanted:
+                found[key] = pk
+        return found
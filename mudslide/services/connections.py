@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from honahlee.core import BaseService
 from honahlee.utils.misc import fresh_uuid4
 
@@ -17,3 +19,30 @@ class ConnectionService(BaseService):
 
     def unregister_connection(self, conn):
         del self.connections[conn.conn_id]
+
+    def broadcast(self, text, connections=None):
+        """
+        Sends the same message to many connections. Connections are grouped by their render
+        fingerprint and the message is rendered and encoded once per group, with every member
+        of a group being handed the same bytes object.
+
+        Args:
+            text (str or callable): The markup to send. If callable, it is called with the first
+                connection of each group and must return the markup. Use this for messages that
+                depend on width, styling or other per-group details.
+            connections (iterable, optional): The connections to send to. Defaults to all of them.
+
+        Returns:
+            renders (int): How many times the message was rendered.
+        """
+        if connections is None:
+            connections = self.connections.values()
+        groups = defaultdict(list)
+        for conn in connections:
+            groups[conn.render_fingerprint()].append(conn)
+        for members in groups.values():
+            first = members[0]
+            data = first.render_output(text(first) if callable(text) else text)
+            for conn in members:
+                conn.send_rendered(data)
+        return len(groups)
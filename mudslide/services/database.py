@@ -1,6 +1,204 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.db import transaction, connections, close_old_connections
 from honahlee.core import BaseService
 
 
 class DatabaseService(BaseService):
+    """
+    Owns the one thread that writes to the database. Writes are submitted as functions and
+    queued; the writer groups whatever arrives within flush_interval into one transaction,
+    so SQLite only ever sees a single writer.
+
+    Reads run on a fixed pool of threads instead, so each keeps its persistent connection
+    rather than connections being opened on whichever thread happens to run the query.
+    """
     setup_order = -1000
     start_order = -1000
+    # Seconds the writer waits for more writes before committing a batch.
+    flush_interval = 0.05
+    # Most writes committed in one transaction.
+    batch_size = 1000
+
+    def __init__(self):
+        super().__init__()
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.readers = None
+        self.stats = {
+            'batches': 0,
+            'writes': 0,
+            'failed': 0,
+            'last_commit': 0.0,
+            'max_commit': 0.0,
+            'total_commit': 0.0,
+            'last_wait': 0.0,
+        }
+
+    def setup(self):
+        self.thread = threading.Thread(target=self.run_writer, name='mudslide-db-writer', daemon=True)
+        self.thread.start()
+        self.readers = ThreadPoolExecutor(max_workers=self.app.config.db_threads,
+                                          thread_name_prefix='mudslide-db-reader')
+
+    def stop(self, timeout=5.0):
+        """
+        Commit everything queued and stop the writer thread. This blocks until it's done.
+
+        Args:
+            timeout (float): Most seconds to wait for the writer.
+        """
+        if self.readers is not None:
+            self.readers.shutdown(wait=False)
+            self.readers = None
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+
+    @property
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def status(self):
+        """
+        Report how the writer is doing.
+
+        Returns:
+            status (dict): The queue depth, counters, and commit latencies in milliseconds.
+        """
+        stats = self.stats
+        return {
+            'queue_depth': self.queue_depth,
+            'batches': stats['batches'],
+            'writes': stats['writes'],
+            'failed': stats['failed'],
+            'last_commit_ms': stats['last_commit'] * 1000,
+            'max_commit_ms': stats['max_commit'] * 1000,
+            'avg_commit_ms': (stats['total_commit'] / stats['batches'] * 1000) if stats['batches'] else 0.0,
+            'last_wait_ms': stats['last_wait'] * 1000,
+        }
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue a write. It runs on the writer thread, inside the batch's transaction and
+        its own savepoint, so a failing write doesn't undo the others.
+
+        Args:
+            func (callable): Does the writing. Called with args and kwargs.
+
+        Returns:
+            future (Future): Resolves to what func returned, once the batch has committed.
+        """
+        future = Future()
+        if self.thread is None or threading.current_thread() is self.thread:
+            # no writer, such as in a shell, or a write queueing another. just run it.
+            try:
+                with transaction.atomic():
+                    future.set_result(func(*args, **kwargs))
+            except Exception as err:
+                future.set_exception(err)
+            return future
+        self.queue.put((func, args, kwargs, future, time.perf_counter()))
+        return future
+
+    async def write(self, func, *args, **kwargs):
+        """
+        Queue a write and wait for it to be committed.
+
+        Args:
+            func (callable): Does the writing. Called with args and kwargs.
+
+        Returns:
+            result (any): What func returned.
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    async def read(self, func, *args, **kwargs):
+        """
+        Run a function that reads from the database on the reader pool.
+
+        Args:
+            func (callable): Does the reading. Called with args and kwargs.
+
+        Returns:
+            result (any): What func returned.
+        """
+        if self.readers is None:
+            return func(*args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.readers, self.run_read, func, args, kwargs)
+
+    def run_read(self, func, args, kwargs):
+        close_old_connections()
+        return func(*args, **kwargs)
+
+    def run_writer(self):
+        try:
+            stopping = False
+            while not stopping:
+                if (item := self.queue.get()) is None:
+                    break
+                batch = [item]
+                deadline = time.perf_counter() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    if (remaining := deadline - time.perf_counter()) <= 0:
+                        break
+                    try:
+                        item = self.queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self.write_batch(batch)
+            # anything submitted while stopping.
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    self.write_batch([item])
+        finally:
+            connections.close_all()
+
+    def write_batch(self, batch):
+        close_old_connections()
+        results = list()
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                for func, args, kwargs, future, queued in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction.atomic():
+                            results.append((future, True, func(*args, **kwargs)))
+                    except Exception as err:
+                        results.append((future, False, err))
+        except Exception as err:
+            # the commit itself failed, so nothing was written.
+            self.stats['failed'] += len(results)
+            for future, ok, result in results:
+                future.set_exception(result if not ok else err)
+            return
+        finished = time.perf_counter()
+        stats = self.stats
+        stats['batches'] += 1
+        stats['writes'] += len(results)
+        stats['last_commit'] = elapsed = finished - started
+        stats['total_commit'] += elapsed
+        stats['max_commit'] = max(stats['max_commit'], elapsed)
+        stats['last_wait'] = finished - batch[0][4]
+        for future, ok, result in results:
+            if ok:
+                future.set_result(result)
+            else:
+                stats['failed'] += 1
+                future.set_exception(result)
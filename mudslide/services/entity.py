@@ -7,29 +7,445 @@ from mudslide.utils.ansi import ANSIString
 from mudslide.entities.base import BaseEntity
 
 import datetime
+import sys
+from bisect import bisect_left
+import time
+import weakref
 import pytz
+from uuid import UUID
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+def _uuid_int(uuid):
+    return uuid.int if isinstance(uuid, UUID) else UUID(str(uuid)).int
+
+
+def _int_uuid(value):
+    return UUID(int=value)
+
+
+class EntityIndex(Mapping):
+    """
+    Read-only view of every entity, by id or by uuid. Membership tests, iteration and len()
+    cover every indexed entity, but looking one up only finds entities already in memory; the
+    rest raise KeyError, so use EntityService.fetch() for those.
+    """
+
+    def __init__(self, keys, fetch, to_key=None, from_key=None):
+        self._keys = keys
+        self._fetch = fetch
+        self._to_key = to_key
+        self._from_key = from_key
+
+    def __getitem__(self, key):
+        if self._to_key:
+            key = self._to_key(key)
+        if key not in self._keys or (found := self._fetch(key)) is None:
+            raise KeyError(key)
+        return found
+
+    def __contains__(self, key):
+        if self._to_key:
+            key = self._to_key(key)
+        return key in self._keys
+
+    def __iter__(self):
+        if self._from_key:
+            return map(self._from_key, self._keys)
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
 
 
 class EntityService(BaseService):
+    # How many unpinned entities are kept after their last use.
+    resident_size = 5000
 
     def __init__(self):
-        self.uuid_map = dict()
-        self.id_map = dict()
+        # Lightweight rows for every entity: id -> (uuid as int, type id, interned iname).
+        self.index = dict()
+        self.uuid_index = dict()
+        self.type_names = dict()
+        self.type_ids = dict()
+        # Names by type: exact iname -> id, and (iname, id) pairs sorted for prefix searches.
+        self.names = dict()
+        self.sorted_names = dict()
+        # Recently used entities in LRU order, and the ones that are never evicted.
+        self.resident = OrderedDict()
+        self.pinned = dict()
+        self.pin_counts = dict()
+        # Every entity object still referenced anywhere, so an entity is never created twice.
+        self.live = weakref.WeakValueDictionary()
+        self.id_map = EntityIndex(self.index, self.get_by_id)
+        self.uuid_map = EntityIndex(self.uuid_index, self._get_by_uuid_int, _uuid_int, _int_uuid)
         self.type_map = dict()
+        self.boot_times = dict()
+
+    def register_entity(self, ent, entity_type=None):
+        """
+        Add a new entity to the index and make it resident.
+
+        Args:
+            ent (BaseEntity): The new entity.
+            entity_type (EntityType, optional): Its type's model, for a type that may be new.
+                Looked up if it's needed and not given, which hits the database.
+        """
+        if ent.type_id not in self.type_names:
+            name = (entity_type or EntityType.objects.get(pk=ent.type_id)).name
+            self.type_names[ent.type_id] = name
+            self.type_ids[name] = ent.type_id
+        iname = sys.intern(ent.iname)
+        self.index[ent.pk] = (ent._uuid, ent.type_id, iname)
+        self.uuid_index[ent._uuid] = ent.pk
+        self.index_name(ent.pk, ent.type_id, iname)
+        self.live[ent.pk] = ent
+        self.make_resident(ent)
+
+    def unregister_entity(self, ent):
+        """
+        Forget an entity that was deleted.
+
+        Args:
+            ent (BaseEntity): The deleted entity.
+        """
+        if (row := self.index.pop(ent.pk, None)) is None:
+            return
+        self.uuid_index.pop(row[0], None)
+        self.unindex_name(ent.pk, row[1], row[2])
+        self.resident.pop(ent.pk, None)
+        self.pinned.pop(ent.pk, None)
+        self.pin_counts.pop(ent.pk, None)
+        self.live.pop(ent.pk, None)
+        self.app.services['attribute'].forget(ent.pk)
+
+    def index_name(self, pk, type_id, iname):
+        self.names.setdefault(type_id, dict())[iname] = pk
+        pairs = self.sorted_names.setdefault(type_id, list())
+        pairs.insert(bisect_left(pairs, (iname, pk)), (iname, pk))
+
+    def unindex_name(self, pk, type_id, iname):
+        names = self.names.get(type_id, dict())
+        if names.get(iname, None) == pk:
+            del names[iname]
+        pairs = self.sorted_names.get(type_id, list())
+        position = bisect_left(pairs, (iname, pk))
+        if position < len(pairs) and pairs[position] == (iname, pk):
+            del pairs[position]
+            # another entity of the same name takes over exact lookups
+            if iname not in names and (position < len(pairs) and pairs[position][0] == iname):
+                names[iname] = pairs[position][1]
+
+    def rename_entity(self, ent, new_name):
+        """
+        Rename an entity, saving the name and updating the name index. The row is updated
+        on the database writer, so the model doesn't have to be loaded.
+
+        Args:
+            ent (BaseEntity): The entity to rename.
+            new_name (str): The new name. It will be sanitized.
+
+        Returns:
+            old_name (str): The previous name.
+            new_name (str): The name as saved.
+        """
+        new_name = self.sanitize_name(new_name)
+        old_name, old_iname = ent.name, self.index[ent.pk][2]
+        iname = sys.intern(new_name.lower())
+        self.app.services['database'].submit(Entity.objects.filter(pk=ent.pk).update, name=new_name, iname=iname)
+        if (model := ent._model) is not None:
+            model.name, model.iname = new_name, iname
+        ent.name = sys.intern(new_name)
+        self.unindex_name(ent.pk, ent.type_id, old_iname)
+        self.index[ent.pk] = (ent._uuid, ent.type_id, iname)
+        self.index_name(ent.pk, ent.type_id, iname)
+        return old_name, new_name
+
+    async def filter_accessible(self, accessor, resources, perm):
+        """
+        Find which of many resources an accessor has a permission on, such as when listing
+        games or channels. This is much faster than calling access() on each.
+
+        Args:
+            accessor (BaseEntity): Who wants access.
+            resources (iterable): The resources to check.
+            perm (str): The permission's name.
+
+        Returns:
+            allowed (list): The accessible resources, in their original order.
+        """
+        return await self.app.services['access'].filter(accessor, resources, perm)
+
+    async def find_name(self, entity_type, name):
+        """
+        Find an entity of a type by its exact name, ignoring case.
+
+        Args:
+            entity_type (str): The type's name, like 'account'.
+            name (str): The name to look for.
+
+        Returns:
+            entity (BaseEntity or None): The entity, if found.
+        """
+        names = self.names.get(self.type_ids.get(entity_type, None), None)
+        if not names or (pk := names.get(name.strip().lower(), None)) is None:
+            return None
+        return await self.fetch(pk)
+
+    async def search_names(self, entity_type, prefix, limit=None):
+        """
+        Find entities of a type whose names start with some text, ignoring case.
+
+        Args:
+            entity_type (str): The type's name, like 'account'.
+            prefix (str): The start of the name.
+            limit (int, optional): The most entities to return.
+
+        Returns:
+            entities (list): Matching entities, ordered by name.
+        """
+        pairs = self.sorted_names.get(self.type_ids.get(entity_type, None), None)
+        prefix = prefix.strip().lower()
+        if not pairs or not prefix:
+            return []
+        found = list()
+        position = bisect_left(pairs, (prefix,))
+        while position < len(pairs) and pairs[position][0].startswith(prefix):
+            if limit is not None and len(found) >= limit:
+                break
+            found.append(pairs[position][1])
+            position += 1
+        return await self.fetch_many(found)
+
+    def get_by_id(self, pk):
+        """
+        Get an entity by id, if it's in memory. This never hits the database, so it's safe
+        on the event loop; use fetch() for an entity that may not be loaded yet.
+
+        Args:
+            pk (int): The entity's id.
+
+        Returns:
+            entity (BaseEntity or None): The entity, or None if it isn't in memory.
+        """
+        if (ent := self.pinned.get(pk, None)) is not None:
+            return ent
+        if (ent := self.resident.get(pk, None)) is not None:
+            self.resident.move_to_end(pk)
+            return ent
+        if (ent := self.live.get(pk, None)) is not None:
+            self.make_resident(ent)
+        return ent
 
-    def register_entity(self, ent):
-        self.uuid_map[ent.uuid] = ent
-        self.id_map[ent.pk] = ent
+    def get_by_uuid(self, uuid):
+        return self._get_by_uuid_int(_uuid_int(uuid))
+
+    def _get_by_uuid_int(self, uuid):
+        if (pk := self.uuid_index.get(uuid, None)) is None:
+            return None
+        return self.get_by_id(pk)
+
+    async def fetch(self, pk):
+        """
+        Get an entity by id, loading its model on the database readers if it isn't in memory.
+
+        Args:
+            pk (int): The entity's id.
+
+        Returns:
+            entity (BaseEntity or None): The entity, or None if there is no such entity.
+        """
+        if (ent := self.get_by_id(pk)) is not None or pk not in self.index:
+            return ent
+        found = await self.fetch_many((pk,))
+        return found[0] if found else None
+
+    async def fetch_many(self, pks):
+        """
+        Get many entities by id. The ones that aren't in memory are loaded together on the
+        database readers, with one query per entity type, and created back on the event loop.
+
+        Args:
+            pks (iterable): Entity ids.
+
+        Returns:
+            entities (list): The entities in the same order. Unknown ids are skipped.
+        """
+        pks = [pk for pk in pks if pk in self.index]
+        models = list()
+        if (missing := self.missing_models(pks)):
+            models = await self.app.services['database'].read(self.read_models, missing)
+        return self.build_many(pks, models)
+
+    def load_many(self, pks):
+        """
+        Like fetch_many(), but querying right here. This blocks, so it's only for code that
+        runs before the event loop, such as service setup, or in a shell.
+
+        Args:
+            pks (iterable): Entity ids.
+
+        Returns:
+            entities (list): The entities in the same order. Unknown ids are skipped.
+        """
+        pks = [pk for pk in pks if pk in self.index]
+        return self.build_many(pks, self.read_models(self.missing_models(pks)))
+
+    def missing_models(self, pks):
+        """
+        Work out which models must be loaded to create the entities that aren't in memory.
+
+        Args:
+            pks (list): Indexed entity ids.
+
+        Returns:
+            missing (list): (component, ids) pairs, one per entity type, for read_models().
+        """
+        missing = dict()
+        for pk in pks:
+            if pk not in self.pinned and pk not in self.resident and pk not in self.live:
+                missing.setdefault(self.index[pk][1], list()).append(pk)
+        return [(self.type_map.get(self.type_names[type_id], BaseEntity).component, ids)
+                for type_id, ids in missing.items()]
+
+    @staticmethod
+    def read_models(missing):
+        """
+        Load Entity models, with the component of each type. This only queries and touches
+        no service state, so it can run on a database reader.
+
+        Args:
+            missing (list): (component, ids) pairs from missing_models().
+
+        Returns:
+            models (list): The Entity models found.
+        """
+        models = list()
+        for component, ids in missing:
+            queryset = Entity.objects.filter(pk__in=ids)
+            if component:
+                queryset = queryset.select_related(component)
+            models.extend(queryset)
+        return models
+
+    def build_many(self, pks, models):
+        """
+        Create entities from loaded models and make them resident. An entity is set up
+        here, the first time it's loaded, rather than when the server starts.
+
+        Args:
+            pks (list): The ids that were asked for, in order.
+            models (list): Entity models from read_models().
+
+        Returns:
+            entities (list): The entities in the order of pks. Ids without one are skipped.
+        """
+        # held here too, as the resident LRU may evict them before they're returned.
+        made = dict()
+        for model in models:
+            if model.pk not in self.index:
+                # deleted while it was being loaded.
+                continue
+            if (ent := self.live.get(model.pk, None)) is None:
+                # another fetch may have created it while this one was waiting.
+                ent = self.type_map.get(self.type_names[model.entity_type_id], BaseEntity)(model)
+                self.live[ent.pk] = ent
+                self.make_resident(ent)
+                ent.setup()
+            made[model.pk] = ent
+        found = [made.get(pk, None) or self.get_by_id(pk) for pk in pks]
+        return [ent for ent in found if ent is not None]
+
+    async def all_of_type(self, entity_type):
+        """
+        Get every entity of a type, sorted by name.
+
+        Args:
+            entity_type (str): The type's name, such as 'account'.
+
+        Returns:
+            entities (list): The entities.
+        """
+        if (type_id := self.type_ids.get(entity_type, None)) is None:
+            return list()
+        return await self.fetch_many([pk for iname, pk in self.sorted_names.get(type_id, ())])
+
+    def count_of_type(self, entity_type):
+        if (type_id := self.type_ids.get(entity_type, None)) is None:
+            return 0
+        return len(self.sorted_names.get(type_id, ()))
+
+    def make_resident(self, ent):
+        if ent.pk in self.pin_counts:
+            self.pinned[ent.pk] = ent
+            return
+        self.resident[ent.pk] = ent
+        self.resident.move_to_end(ent.pk)
+        while len(self.resident) > self.resident_size:
+            pk, evicted = self.resident.popitem(last=False)
+            self.app.services['attribute'].evict(pk)
+
+    def pin(self, ent):
+        """
+        Keep an entity resident until it's unpinned, such as while it's connected. Pins are
+        counted, so every pin() needs its own unpin().
+
+        Args:
+            ent (BaseEntity): The entity to pin.
+        """
+        self.pin_counts[ent.pk] = self.pin_counts.get(ent.pk, 0) + 1
+        self.resident.pop(ent.pk, None)
+        self.pinned[ent.pk] = ent
+
+    def unpin(self, ent):
+        count = self.pin_counts.get(ent.pk, 0)
+        if count > 1:
+            self.pin_counts[ent.pk] = count - 1
+            return
+        self.pin_counts.pop(ent.pk, None)
+        if (found := self.pinned.pop(ent.pk, None)) is not None:
+            self.make_resident(found)
 
     def setup(self):
         self.type_map = self.app.classes['entities']
+        self.boot_times = self.load_entities()
+        self.app.config.logs['application'].info(
+            "Loaded entities: " + ", ".join(f"{k} {v:.2f}s" for k, v in self.boot_times.items()))
+
+    def load_entities(self):
+        """
+        Load the index of every Entity: its id, uuid, type and name, and the name index per
+        type. Entity objects and their
+        models are only created when they are first looked up, so this is two queries no
+        matter how many entities there are.
 
-        for entmod in Entity.objects.all():
-            cls = self.type_map.get(entmod.entity_type.name, BaseEntity)
-            new_ent = cls(entmod)
-            self.register_entity(new_ent)
-        for ent in self.id_map.values():
-            ent.setup()
+        Returns:
+            times (dict): Seconds spent in each stage of loading, for startup reports.
+        """
+        times = dict()
+        started = time.perf_counter()
+        mark = started
+
+        self.type_names = dict(EntityType.objects.values_list('pk', 'name'))
+        self.type_ids = {name: pk for pk, name in self.type_names.items()}
+        now = time.perf_counter()
+        times['types'] = now - mark
+        mark = now
+
+        rows = Entity.objects.values_list('pk', 'uuid', 'entity_type_id', 'iname')
+        for pk, uuid, type_pk, iname in rows.iterator(chunk_size=10000):
+            iname = sys.intern(iname)
+            self.index[pk] = (uuid.int, type_pk, iname)
+            self.uuid_index[uuid.int] = pk
+            self.names.setdefault(type_pk, dict()).setdefault(iname, pk)
+            self.sorted_names.setdefault(type_pk, list()).append((iname, pk))
+        for pairs in self.sorted_names.values():
+            pairs.sort()
+        now = time.perf_counter()
+        times['index'] = now - mark
+        times['total'] = now - started
+        return times
 
     def generate_uuid(self):
         return fresh_uuid4(self.uuid_map.keys())
@@ -58,3 +474,4 @@ class EntityService(BaseService):
         name = ANSIString(name).clean()
         name = name.strip()
         return name
+
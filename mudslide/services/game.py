@@ -10,9 +10,10 @@ class GameService(BaseService):
     def setup(self):
         srv_ent = self.app.services['entity']
 
-        for entry in GameEntry.objects.all():
-            if (found := srv_ent.uuid_map.get(entry.entity.uuid, None)):
-                self.register_entity(found)
+        # setup runs before the event loop, so the games can be loaded right here.
+        for found in srv_ent.load_many(list(GameEntry.objects.values_list('entity_id', flat=True))):
+            self.register_entity(found)
 
     def register_entity(self, ent):
         self.game_keys[ent.game_key] = ent
+        self.app.services['entity'].pin(ent)
@@ -2,16 +2,53 @@ from honahlee.core import BaseService
 
 
 class OptionService(BaseService):
+    # Attribute category that option values are saved to on accounts.
+    category = 'option'
 
     def __init__(self):
         super().__init__()
         self.options = dict()
 
     def setup(self):
-        for name, op_def in self.app.config.options.items():
+        for name, op_def in self.app.config.user_options.items():
             op_class = self.app.classes['options'][op_def['class']]
             self.options[name] = op_class(self, name, op_def['description'], op_def['default'])
 
     def get(self, connection, option):
-        op = self.options[option]
-        return op.get(connection)
+        return connection.options.get(option)
+
+    async def load_account(self, account):
+        """
+        Load all of an account's saved options, if they haven't been already.
+
+        Args:
+            account (AccountEntity): The account to load.
+        """
+        if not account.options_loaded:
+            account.load_options(await self.app.services['attribute'].fetch(account.pk, self.category))
+
+    def queue_save(self, account, key, serialized):
+        """
+        Save an option value to the account's Attributes. It's written to the database in
+        the background, by the attribute service's next flush.
+
+        Args:
+            account (AccountEntity): The account the option is saved on.
+            key (str): The option's name.
+            serialized (any): The JSON-ready value.
+        """
+        account.set_attribute(self.category, key, serialized)
+
+    def option_changed(self, connection, key):
+        """
+        Called when an option's value changes for a connection, and for its account's other
+        connections if it was saved.
+
+        Args:
+            connection (AsyncGameConsumerMixin): The connection it was changed on.
+            key (str): The option's name.
+        """
+        account = connection.get_account()
+        for conn in self.app.services['connections'].connections.values():
+            if conn is connection or (account is not None and conn.get_account() is account):
+                conn.styling.invalidate_theme()
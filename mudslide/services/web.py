@@ -1,3 +1,5 @@
+import asyncio
+
 import ujson
 
 from django.conf.urls import url
@@ -9,6 +11,7 @@ from channels.consumer import AsyncConsumer
 from channels.auth import AuthMiddlewareStack
 
 from honahlee.core import BaseService
+from mudslide.utils.ansi import parse_html
 
 
 class LifespanAsyncConsumer(AsyncConsumer):
@@ -27,6 +30,9 @@ class LifespanAsyncConsumer(AsyncConsumer):
         pass
 
     async def lifespan_shutdown(self, event):
+        # write anything still waiting to be saved.
+        await self.app.services['attribute'].flush()
+        await asyncio.get_running_loop().run_in_executor(None, self.app.services['database'].stop)
         await self.send({
             'type': 'lifespan.shutdown.complete'
         })
@@ -42,12 +48,56 @@ class GameConsumer(AsyncWebsocketConsumer):
     app = None
     service = None
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.conn_id = None
+
     async def connect(self):
         await self.accept()
         print(f"RECEIVED A GAME CONNECTION: {self.scope}")
+        self.app.services['connections'].register_connection(self)
 
     async def disconnect(self, code):
         print(f"CLOSED {self} with {code}")
+        if self.conn_id:
+            self.app.services['connections'].unregister_connection(self)
+
+    def get_account(self):
+        return None
+
+    def uses_screenreader(self):
+        return False
+
+    def render_fingerprint(self):
+        """
+        Web clients all get the same HTML, whatever their screen or colors, so they share one
+        rendering in broadcasts.
+        """
+        return (self.scope.get('type', None), 'html')
+
+    def render_output(self, text):
+        """
+        Renders markup into the JSON message web clients display, with pre-rendered HTML.
+
+        Args:
+            text (str): Text with markup.
+
+        Returns:
+            data (bytes): The UTF-8 encoded message.
+        """
+        return ujson.dumps({'type': 'text', 'data': parse_html(text)}).encode('utf-8')
+
+    def send_rendered(self, data):
+        """
+        Queues output that was already rendered by render_output().
+
+        Args:
+            data (bytes): The output.
+        """
+        asyncio.ensure_future(self.send(text_data=data.decode('utf-8')))
+
+    def msg(self, text):
+        self.send_rendered(self.render_output(text))
 
 
 class LinkConsumer(AsyncJsonWebsocketConsumer):
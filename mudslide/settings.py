@@ -25,6 +25,14 @@ class AnsiSettings:
         self.COLOR_XTERM256_EXTRA_GFG = []
         # XTERM256 grayscale background. Default is \|\[=([a-z])'
         self.COLOR_XTERM256_EXTRA_GBG = []
+        # Extend the available regexes for adding 24-bit (truecolor) values in-game. Given
+        # as a list of regexes, where each regex must contain one anonymous group holding
+        # six hex digits. Default is r'\|#([0-9a-fA-F]{6})', which allows e.g. |#ff8000 for
+        # orange. Clients without truecolor support get the nearest xterm256/ANSI color.
+        # Truecolor foreground
+        self.COLOR_TRUECOLOR_EXTRA_FG = []
+        # Truecolor background. Default is r'\|\[#([0-9a-fA-F]{6})'
+        self.COLOR_TRUECOLOR_EXTRA_BG = []
         # ANSI does not support bright backgrounds, so Evennia fakes this by mapping it to
         # XTERM256 backgrounds where supported. This is a list of tuples that maps the wanted
         # ansi tag (not a regex!) to a valid XTERM256 background tag, such as `(r'{[r', r'{[500')`.
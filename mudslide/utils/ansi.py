@@ -18,6 +18,7 @@ I just tweaked a few imports. - Volund
 #######
 """
 import functools
+import html
 
 import re
 from collections import OrderedDict
@@ -73,9 +74,203 @@ ANSI_ESCAPES = ("{{", "\\\\", "\|\|")
 _PARSE_CACHE = OrderedDict()
 _PARSE_CACHE_SIZE = 10000
 
+_HTML_CACHE = OrderedDict()
+_HTML_CACHE_SIZE = 10000
+
 _COLOR_NO_DEFAULT = settings.COLOR_NO_DEFAULT
 
 
+def _ansi16_fallback(red, green, blue, background=False):
+    """
+    Work out the closest 16-color ANSI sequence for an xterm256 color. This is
+    only used to build the lookup tables below; at runtime a downgrade is a
+    simple index into them.
+
+    Args:
+        red (int or float): Red component, in the 0-5 range.
+        green (int or float): Green component, in the 0-5 range.
+        blue (int or float): Blue component, in the 0-5 range.
+        background (bool): Return a background sequence instead of a foreground one.
+
+    Returns:
+        sequence (str): The ANSI sequence.
+
+    """
+    if red == green == blue and red < 3:
+        if background:
+            return ANSI_BACK_BLACK
+        elif red >= 1:
+            return ANSI_HILITE + ANSI_BLACK
+        else:
+            return ANSI_NORMAL + ANSI_BLACK
+    elif red == green == blue:
+        if background:
+            return ANSI_BACK_WHITE
+        elif red >= 4:
+            return ANSI_HILITE + ANSI_WHITE
+        else:
+            return ANSI_NORMAL + ANSI_WHITE
+    elif red > green and red > blue:
+        if background:
+            return ANSI_BACK_RED
+        elif red >= 3:
+            return ANSI_HILITE + ANSI_RED
+        else:
+            return ANSI_NORMAL + ANSI_RED
+    elif red == green and red > blue:
+        if background:
+            return ANSI_BACK_YELLOW
+        elif red >= 3:
+            return ANSI_HILITE + ANSI_YELLOW
+        else:
+            return ANSI_NORMAL + ANSI_YELLOW
+    elif red == blue and red > green:
+        if background:
+            return ANSI_BACK_MAGENTA
+        elif red >= 3:
+            return ANSI_HILITE + ANSI_MAGENTA
+        else:
+            return ANSI_NORMAL + ANSI_MAGENTA
+    elif green > blue:
+        if background:
+            return ANSI_BACK_GREEN
+        elif green >= 3:
+            return ANSI_HILITE + ANSI_GREEN
+        else:
+            return ANSI_NORMAL + ANSI_GREEN
+    elif green == blue:
+        if background:
+            return ANSI_BACK_CYAN
+        elif green >= 3:
+            return ANSI_HILITE + ANSI_CYAN
+        else:
+            return ANSI_NORMAL + ANSI_CYAN
+    else:  # mostly blue
+        if background:
+            return ANSI_BACK_BLUE
+        elif blue >= 3:
+            return ANSI_HILITE + ANSI_BLUE
+        else:
+            return ANSI_NORMAL + ANSI_BLUE
+
+
+# Lookup tables indexed by xterm256 color code, built once at import. Only the
+# 6x6x6 color cube (16-231) and the greyscale ramp (232-255) are ever produced
+# by the markup, so indexes 0-15 are left empty in the fallback tables.
+#   XTERM256_FG/XTERM256_BG - the escape sequence for every code.
+#   XTERM256_FG_ANSI16/XTERM256_BG_ANSI16 - the closest 16-color sequence.
+XTERM256_FG = ["\033[38;5;%sm" % code for code in range(256)]
+XTERM256_BG = ["\033[48;5;%sm" % code for code in range(256)]
+XTERM256_FG_ANSI16 = [""] * 256
+XTERM256_BG_ANSI16 = [""] * 256
+
+for _code in range(16, 232):
+    _red, _green, _blue = (_code - 16) // 36, ((_code - 16) % 36) // 6, (_code - 16) % 6
+    XTERM256_FG_ANSI16[_code] = _ansi16_fallback(_red, _green, _blue)
+    XTERM256_BG_ANSI16[_code] = _ansi16_fallback(_red, _green, _blue, background=True)
+for _code in range(232, 256):
+    # greyscale |=b through |=y, in the same 0-5 scale as the cube.
+    _gray = (_code - 231) / 5.0
+    XTERM256_FG_ANSI16[_code] = _ansi16_fallback(_gray, _gray, _gray)
+    XTERM256_BG_ANSI16[_code] = _ansi16_fallback(_gray, _gray, _gray, background=True)
+del _code, _red, _green, _blue, _gray
+
+# The 0-255 intensity each cube step (0-5) stands for, per the xterm palette.
+XTERM256_CUBE_STEPS = (0, 95, 135, 175, 215, 255)
+# Maps a 0-255 channel intensity to the nearest cube step.
+_CHANNEL_TO_CUBE = [
+    min(range(6), key=lambda step, val=val: abs(XTERM256_CUBE_STEPS[step] - val))
+    for val in range(256)
+]
+
+
+def rgb_to_xterm256(red, green, blue):
+    """
+    Find the xterm256 color-cube code for a 24-bit color.
+
+    Args:
+        red (int): Red intensity, 0-255.
+        green (int): Green intensity, 0-255.
+        blue (int): Blue intensity, 0-255.
+
+    Returns:
+        code (int): The xterm256 color code (16-231).
+
+    """
+    return 16 + 36 * _CHANNEL_TO_CUBE[red] + 6 * _CHANNEL_TO_CUBE[green] + _CHANNEL_TO_CUBE[blue]
+
+
+def rgb_to_ansi16(red, green, blue, background=False):
+    """
+    Downgrade a 24-bit color to the closest 16-color ANSI sequence, using the
+    same tables as the xterm256 fallback.
+
+    Args:
+        red (int): Red intensity, 0-255.
+        green (int): Green intensity, 0-255.
+        blue (int): Blue intensity, 0-255.
+        background (bool): Return a background sequence.
+
+    Returns:
+        sequence (str): The ANSI sequence.
+
+    """
+    table = XTERM256_BG_ANSI16 if background else XTERM256_FG_ANSI16
+    return table[rgb_to_xterm256(red, green, blue)]
+
+
+# 24-bit colors are quantized to xterm256 through a 4096-bucket table (4 bits
+# per channel). Buckets are filled on first use, so each bucket searches the
+# palette only once for the lifetime of the process.
+_TRUECOLOR_BUCKETS = [None] * 4096
+# The greyscale ramp (232-255) runs from 8 to 238 in steps of 10.
+_XTERM256_GRAYS = [(code, 8 + 10 * (code - 232)) for code in range(232, 256)]
+
+
+def _nearest_xterm256(red, green, blue):
+    """
+    Search the color cube and the greyscale ramp for the xterm256 code closest
+    to a 24-bit color.
+
+    """
+    steps = XTERM256_CUBE_STEPS
+    best = rgb_to_xterm256(red, green, blue)
+    cube = best - 16
+    best_dist = (
+        (steps[cube // 36] - red) ** 2
+        + (steps[(cube % 36) // 6] - green) ** 2
+        + (steps[cube % 6] - blue) ** 2
+    )
+    for code, level in _XTERM256_GRAYS:
+        dist = (level - red) ** 2 + (level - green) ** 2 + (level - blue) ** 2
+        if dist < best_dist:
+            best, best_dist = code, dist
+    return best
+
+
+def truecolor_to_xterm256(red, green, blue):
+    """
+    Quantize a 24-bit color to the nearest xterm256 code.
+
+    Args:
+        red (int): Red intensity, 0-255.
+        green (int): Green intensity, 0-255.
+        blue (int): Blue intensity, 0-255.
+
+    Returns:
+        code (int): The xterm256 color code (16-255).
+
+    """
+    bucket = ((red >> 4) << 8) | ((green >> 4) << 4) | (blue >> 4)
+    code = _TRUECOLOR_BUCKETS[bucket]
+    if code is None:
+        # quantize using the bucket's representative color, spread evenly over
+        # 0-255 so that pure black and white land on their exact palette entries.
+        code = _nearest_xterm256((red >> 4) * 17, (green >> 4) * 17, (blue >> 4) * 17)
+        _TRUECOLOR_BUCKETS[bucket] = code
+    return code
+
+
 class ANSIParser:
     """
     A class that parses ANSI markup
@@ -162,17 +357,23 @@ class ANSIParser:
         xterm256_gfg = settings.COLOR_XTERM256_EXTRA_GFG
         xterm256_gbg = settings.COLOR_XTERM256_EXTRA_GBG
         ansi_xterm256_bright_bg_map = settings.COLOR_ANSI_XTERM256_BRIGHT_BG_EXTRA_MAP
+        truecolor_fg = settings.COLOR_TRUECOLOR_EXTRA_FG
+        truecolor_bg = settings.COLOR_TRUECOLOR_EXTRA_BG
     else:
         xterm256_fg = [r"\|([0-5])([0-5])([0-5])"]  # |123 - foreground colour
         xterm256_bg = [r"\|\[([0-5])([0-5])([0-5])"]  # |[123 - background colour
         xterm256_gfg = [r"\|=([a-z])"]  # |=a - greyscale foreground
         xterm256_gbg = [r"\|\[=([a-z])"]  # |[=a - greyscale background
+        truecolor_fg = [r"\|#([0-9a-fA-F]{6})"]  # |#ff8000 - 24-bit foreground colour
+        truecolor_bg = [r"\|\[#([0-9a-fA-F]{6})"]  # |[#ff8000 - 24-bit background colour
         ansi_map += settings.COLOR_ANSI_EXTRA_MAP
         xterm256_fg += settings.COLOR_XTERM256_EXTRA_FG
         xterm256_bg += settings.COLOR_XTERM256_EXTRA_BG
         xterm256_gfg += settings.COLOR_XTERM256_EXTRA_GFG
         xterm256_gbg += settings.COLOR_XTERM256_EXTRA_GBG
         ansi_xterm256_bright_bg_map += settings.COLOR_ANSI_XTERM256_BRIGHT_BG_EXTRA_MAP
+        truecolor_fg += settings.COLOR_TRUECOLOR_EXTRA_FG
+        truecolor_bg += settings.COLOR_TRUECOLOR_EXTRA_BG
 
     mxp_re = r"\|lc(.*?)\|lt(.*?)\|le"
 
@@ -185,6 +386,8 @@ class ANSIParser:
     xterm256_bg_sub = re.compile(r"|".join(xterm256_bg), re.DOTALL)
     xterm256_gfg_sub = re.compile(r"|".join(xterm256_gfg), re.DOTALL)
     xterm256_gbg_sub = re.compile(r"|".join(xterm256_gbg), re.DOTALL)
+    truecolor_fg_sub = re.compile(r"|".join(truecolor_fg), re.DOTALL)
+    truecolor_bg_sub = re.compile(r"|".join(truecolor_bg), re.DOTALL)
 
     # xterm256_sub = re.compile(r"|".join([tup[0] for tup in xterm256_map]), re.DOTALL)
     ansi_sub = re.compile(r"|".join([re.escape(tup[0]) for tup in ansi_map]), re.DOTALL)
@@ -279,77 +482,43 @@ class ANSIParser:
                 # letter in range [b..y] (exactly 24 values!)
                 colval = 134 + ord(letter)
 
-            # ansi fallback logic expects r,g,b values in [0..5] range
-            gray = (ord(letter) - 97) / 5.0
-            red, green, blue = gray, gray, gray
+        if not grayscale:
+            colval = 16 + (red * 36) + (green * 6) + blue
 
+        # replaced since some clients (like Potato) does not accept codes with leading zeroes, see issue #1024.
         if use_xterm256:
+            return XTERM256_BG[colval] if background else XTERM256_FG[colval]
+        # xterm256 not supported, look up the closest ansi color instead
+        return XTERM256_BG_ANSI16[colval] if background else XTERM256_FG_ANSI16[colval]
 
-            if not grayscale:
-                colval = 16 + (red * 36) + (green * 6) + blue
+    def sub_truecolor(self, hexmatch, use_truecolor=False, use_xterm256=False, background=False):
+        """
+        This is a replacer method called by `re.sub` with a matched 24-bit
+        color tag. Clients that can't display 24-bit color get the color
+        quantized to xterm256, or further down to 16-color ANSI.
 
-            return "\033[%s8;5;%sm" % (3 + int(background), colval)
-            # replaced since some clients (like Potato) does not accept codes with leading zeroes, see issue #1024.
-            # return "\033[%s8;5;%s%s%sm" % (3 + int(background), colval // 100, (colval % 100) // 10, colval%10)
+        Args:
+            hexmatch (re.matchobject): The match.
+            use_truecolor (bool, optional): Send the 24-bit color as-is.
+            use_xterm256 (bool, optional): Quantize to xterm256 rather than 16 colors.
+            background (bool, optional): If this is a background color.
 
-        else:
-            # xterm256 not supported, convert the rgb value to ansi instead
-            if red == green == blue and red < 3:
-                if background:
-                    return ANSI_BACK_BLACK
-                elif red >= 1:
-                    return ANSI_HILITE + ANSI_BLACK
-                else:
-                    return ANSI_NORMAL + ANSI_BLACK
-            elif red == green == blue:
-                if background:
-                    return ANSI_BACK_WHITE
-                elif red >= 4:
-                    return ANSI_HILITE + ANSI_WHITE
-                else:
-                    return ANSI_NORMAL + ANSI_WHITE
-            elif red > green and red > blue:
-                if background:
-                    return ANSI_BACK_RED
-                elif red >= 3:
-                    return ANSI_HILITE + ANSI_RED
-                else:
-                    return ANSI_NORMAL + ANSI_RED
-            elif red == green and red > blue:
-                if background:
-                    return ANSI_BACK_YELLOW
-                elif red >= 3:
-                    return ANSI_HILITE + ANSI_YELLOW
-                else:
-                    return ANSI_NORMAL + ANSI_YELLOW
-            elif red == blue and red > green:
-                if background:
-                    return ANSI_BACK_MAGENTA
-                elif red >= 3:
-                    return ANSI_HILITE + ANSI_MAGENTA
-                else:
-                    return ANSI_NORMAL + ANSI_MAGENTA
-            elif green > blue:
-                if background:
-                    return ANSI_BACK_GREEN
-                elif green >= 3:
-                    return ANSI_HILITE + ANSI_GREEN
-                else:
-                    return ANSI_NORMAL + ANSI_GREEN
-            elif green == blue:
-                if background:
-                    return ANSI_BACK_CYAN
-                elif green >= 3:
-                    return ANSI_HILITE + ANSI_CYAN
-                else:
-                    return ANSI_NORMAL + ANSI_CYAN
-            else:  # mostly blue
-                if background:
-                    return ANSI_BACK_BLUE
-                elif blue >= 3:
-                    return ANSI_HILITE + ANSI_BLUE
-                else:
-                    return ANSI_NORMAL + ANSI_BLUE
+        Returns:
+            processed (str): The processed match string.
+
+        """
+        try:
+            hexcode = [val for val in hexmatch.groups() if val is not None][0]
+        except IndexError:
+            return hexmatch.group(0)
+        red, green, blue = int(hexcode[0:2], 16), int(hexcode[2:4], 16), int(hexcode[4:6], 16)
+
+        if use_truecolor:
+            return "\033[%s8;2;%s;%s;%sm" % (3 + int(background), red, green, blue)
+        colval = truecolor_to_xterm256(red, green, blue)
+        if use_xterm256:
+            return XTERM256_BG[colval] if background else XTERM256_FG[colval]
+        return XTERM256_BG_ANSI16[colval] if background else XTERM256_FG_ANSI16[colval]
 
     def strip_raw_codes(self, string):
         """
@@ -377,7 +546,9 @@ class ANSIParser:
         """
         return self.mxp_sub.sub(r"\2", string)
 
-    def parse_ansi(self, string, strip_ansi=False, xterm256=False, mxp=False):
+    def parse_ansi(
+        self, string, strip_ansi=False, xterm256=False, mxp=False, truecolor=False, minimize=False
+    ):
         """
         Parses a string, subbing color codes according to the stored
         mapping.
@@ -388,23 +559,34 @@ class ANSIParser:
             xterm256 (boolean, optional): If actually using xterm256 or if
                 these values should be converted to 16-color ANSI.
             mxp (boolean, optional): Parse MXP commands in string.
+            truecolor (boolean, optional): If 24-bit colors should be sent as-is
+                or quantized to what `xterm256` allows.
+            minimize (boolean, optional): Remove redundant escape sequences from
+                the result. See `minimize_sgr`.
 
         Returns:
             string (str): The parsed string.
 
         """
+        global _PARSE_CACHE
         if hasattr(string, "_raw_string"):
             if strip_ansi:
                 return string.clean()
-            else:
+            if not minimize:
                 return string.raw()
+            string = string.raw()
+            cachekey = "%s-raw-minimized" % string
+            if cachekey not in _PARSE_CACHE:
+                _PARSE_CACHE[cachekey] = minimize_sgr(string)
+                if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+                    _PARSE_CACHE.popitem(last=False)
+            return _PARSE_CACHE[cachekey]
 
         if not string:
             return ""
 
         # check cached parsings
-        global _PARSE_CACHE
-        cachekey = "%s-%s-%s-%s" % (string, strip_ansi, xterm256, mxp)
+        cachekey = "%s-%s-%s-%s-%s-%s" % (string, strip_ansi, xterm256, mxp, truecolor, minimize)
         if cachekey in _PARSE_CACHE:
             return _PARSE_CACHE[cachekey]
 
@@ -423,13 +605,21 @@ class ANSIParser:
         def do_xterm256_gbg(part):
             return self.sub_xterm256(part, xterm256, "gbg")
 
+        def do_truecolor_fg(part):
+            return self.sub_truecolor(part, truecolor, xterm256, False)
+
+        def do_truecolor_bg(part):
+            return self.sub_truecolor(part, truecolor, xterm256, True)
+
         in_string = to_str(string)
 
         # do string replacement
         parsed_string = []
         parts = self.ansi_escapes.split(in_string) + [" "]
         for part, sep in zip(parts[::2], parts[1::2]):
-            pstring = self.xterm256_fg_sub.sub(do_xterm256_fg, part)
+            pstring = self.truecolor_fg_sub.sub(do_truecolor_fg, part)
+            pstring = self.truecolor_bg_sub.sub(do_truecolor_bg, pstring)
+            pstring = self.xterm256_fg_sub.sub(do_xterm256_fg, pstring)
             pstring = self.xterm256_bg_sub.sub(do_xterm256_bg, pstring)
             pstring = self.xterm256_gfg_sub.sub(do_xterm256_gfg, pstring)
             pstring = self.xterm256_gbg_sub.sub(do_xterm256_gbg, pstring)
@@ -445,6 +635,9 @@ class ANSIParser:
             # inserted in string)
             return self.strip_raw_codes(parsed_string)
 
+        if minimize:
+            parsed_string = minimize_sgr(parsed_string)
+
         # cache and crop old cache
         _PARSE_CACHE[cachekey] = parsed_string
         if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
@@ -452,6 +645,61 @@ class ANSIParser:
 
         return parsed_string
 
+    def parse_html(self, string, xterm256=True, truecolor=True):
+        """
+        Parses a string into HTML for web clients. Markup is parsed like for
+        telnet and the resulting escape codes become one `<span>` per run of
+        equally styled text. Palette colors are set with classes - `ansi-fg-N`
+        and `ansi-bg-N`, N being the xterm256 index and 0-15 the ANSI colors -
+        while 24-bit colors use inline styles. Underline, blink and inverse add
+        `ansi-underline`, `ansi-blink` and `ansi-inverse`, and highlighting that
+        doesn't select a bright color adds `ansi-bold`. Text is HTML-escaped.
+
+        Args:
+            string (str): The string to parse.
+            xterm256 (boolean, optional): If xterm256 colors should be kept or
+                converted to 16-color ANSI.
+            truecolor (boolean, optional): If 24-bit colors should be kept or
+                quantized to what `xterm256` allows.
+
+        Returns:
+            html (str): The HTML fragment.
+
+        """
+        if hasattr(string, "_raw_string"):
+            string = string.raw()
+            cachekey = "%s-raw" % string
+        else:
+            cachekey = "%s-%s-%s" % (string, xterm256, truecolor)
+        if not string:
+            return ""
+
+        global _HTML_CACHE
+        if cachekey in _HTML_CACHE:
+            _HTML_CACHE.move_to_end(cachekey)
+            return _HTML_CACHE[cachekey]
+
+        if not cachekey.endswith("-raw"):
+            string = self.parse_ansi(string, xterm256=xterm256, truecolor=truecolor)
+        parts = _SGR_RE.split(string)
+        output = []
+        state = SGR_DEFAULT
+        for index in range(0, len(parts), 2):
+            if index:
+                state = apply_sgr(state, parts[index - 1])[0]
+            text = parts[index]
+            if not text:
+                continue
+            text = html.escape(text, quote=False)
+            attrs = _html_attributes(state)
+            output.append('<span %s>%s</span>' % (attrs, text) if attrs else text)
+        result = "".join(output)
+
+        _HTML_CACHE[cachekey] = result
+        if len(_HTML_CACHE) > _HTML_CACHE_SIZE:
+            _HTML_CACHE.popitem(last=False)
+        return result
+
 
 ANSI_PARSER = ANSIParser()
 
@@ -461,7 +709,15 @@ ANSI_PARSER = ANSIParser()
 #
 
 
-def parse_ansi(string, strip_ansi=False, parser=ANSI_PARSER, xterm256=False, mxp=False):
+def parse_ansi(
+    string,
+    strip_ansi=False,
+    parser=ANSI_PARSER,
+    xterm256=False,
+    mxp=False,
+    truecolor=False,
+    minimize=False,
+):
     """
     Parses a string, subbing color codes as needed.
 
@@ -471,12 +727,38 @@ def parse_ansi(string, strip_ansi=False, parser=ANSI_PARSER, xterm256=False, mxp
         parser (ansi.AnsiParser, optional): A parser instance to use.
         xterm256 (bool, optional): Support xterm256 or not.
         mxp (bool, optional): Support MXP markup or not.
+        truecolor (bool, optional): Support 24-bit color or not.
+        minimize (bool, optional): Remove redundant escape sequences.
 
     Returns:
         string (str): The parsed string.
 
     """
-    return parser.parse_ansi(string, strip_ansi=strip_ansi, xterm256=xterm256, mxp=mxp)
+    return parser.parse_ansi(
+        string,
+        strip_ansi=strip_ansi,
+        xterm256=xterm256,
+        mxp=mxp,
+        truecolor=truecolor,
+        minimize=minimize,
+    )
+
+
+def parse_html(string, parser=ANSI_PARSER, xterm256=True, truecolor=True):
+    """
+    Parses a string into HTML for web clients.
+
+    Args:
+        string (str): The string to parse.
+        parser (ansi.AnsiParser, optional): A parser instance to use.
+        xterm256 (bool, optional): Support xterm256 or not.
+        truecolor (bool, optional): Support 24-bit color or not.
+
+    Returns:
+        html (str): The HTML fragment.
+
+    """
+    return parser.parse_html(string, xterm256=xterm256, truecolor=truecolor)
 
 
 def strip_ansi(string, parser=ANSI_PARSER):
@@ -523,6 +805,314 @@ def raw(string):
     return string.replace("{", "{{").replace("|", "||")
 
 
+#
+# SGR state tracking
+#
+
+# Terminal graphic state is tracked as a tuple of
+# (hilite, underline, blink, inverse, fg, bg). The flags are booleans and the
+# colors are the SGR parameters selecting them ("31", "38;5;196", "38;2;1;2;3")
+# or None for the terminal default. A field is SGR_UNKNOWN when nothing seen so
+# far says what it is - text may be appended to whatever the client already has
+# active, so a string that never resets can't assume the default.
+SGR_UNKNOWN = object()
+SGR_DEFAULT = (False, False, False, False, None, None)
+SGR_START = (SGR_UNKNOWN,) * 6
+
+_SGR_RE = re.compile(r"\033\[([0-9;]*)m")
+_SGR_FLAGS = {
+    "1": (0, True),
+    "22": (0, False),
+    "4": (1, True),
+    "24": (1, False),
+    "5": (2, True),
+    "25": (2, False),
+    "7": (3, True),
+    "27": (3, False),
+}
+_SGR_FLAG_CODES = (("1", "22"), ("4", "24"), ("5", "25"), ("7", "27"))
+_SGR_FG = {str(code) for code in list(range(30, 38)) + list(range(90, 98))}
+_SGR_BG = {str(code) for code in list(range(40, 48)) + list(range(100, 108))}
+_SGR_SPACE = " \t\r\n"
+
+
+def apply_sgr(state, params):
+    """
+    Work out the terminal state after an SGR sequence.
+
+    Args:
+        state (tuple): The state before the sequence.
+        params (str): The parameters of the sequence, the `1;31` of `\033[1;31m`.
+
+    Returns:
+        state (tuple): The state after the sequence.
+        reset (bool): If the sequence contained a full reset.
+        unknown (bool): If the sequence contained codes that are not tracked,
+            like italics. These are left to the terminal.
+
+    """
+    state = list(state)
+    reset = unknown = False
+    codes = params.split(";") if params else ["0"]
+    index, total = 0, len(codes)
+    while index < total:
+        code = codes[index]
+        index += 1
+        if code in ("0", "", "00"):
+            state = list(SGR_DEFAULT)
+            reset = True
+        elif code in _SGR_FLAGS:
+            slot, value = _SGR_FLAGS[code]
+            state[slot] = value
+        elif code in _SGR_FG:
+            state[4] = code
+        elif code in _SGR_BG:
+            state[5] = code
+        elif code == "39":
+            state[4] = None
+        elif code == "49":
+            state[5] = None
+        elif code in ("38", "48"):
+            mode = codes[index] if index < total else ""
+            size = 2 if mode == "5" else 4 if mode == "2" else 0
+            if not size or index + size > total:
+                unknown = True
+                break
+            color = ";".join(codes[index - 1 : index + size])
+            index += size
+            state[4 if code == "38" else 5] = color
+        else:
+            unknown = True
+    return tuple(state), reset, unknown
+
+
+def scan_sgr(string, state=SGR_START, start=0, end=None):
+    """
+    Work out the terminal state after the SGR sequences in (part of) a raw
+    string.
+
+    Args:
+        string (str): Text containing raw ANSI sequences.
+        state (tuple, optional): The state before the text.
+        start (int, optional): Where in `string` to start.
+        end (int, optional): Where in `string` to stop.
+
+    Returns:
+        state (tuple): The state after the text.
+
+    """
+    if end is None:
+        end = len(string)
+    for match in _SGR_RE.finditer(string, start, end):
+        state = apply_sgr(state, match.group(1))[0]
+    return state
+
+
+def sgr_params(state):
+    """
+    Build the SGR parameters that select a fully known state from scratch.
+
+    Args:
+        state (tuple): The state to select. May not contain `SGR_UNKNOWN`.
+
+    Returns:
+        params (list): The parameters, starting with a reset.
+
+    """
+    params = ["0"]
+    for flag, (on, _) in zip(state, _SGR_FLAG_CODES):
+        if flag:
+            params.append(on)
+    if state[4]:
+        params.append(state[4])
+    if state[5]:
+        params.append(state[5])
+    return params
+
+
+def sgr_transition(current, target, reset=None):
+    """
+    Build the shortest single SGR sequence that takes a terminal from one state
+    to another.
+
+    Args:
+        current (tuple): The state the terminal is in.
+        target (tuple): The state it should be in.
+        reset (bool, optional): True to always start the sequence with a reset,
+            False to never use one. Needed when untracked attributes must be
+            cleared or kept as well. By default whichever is shorter is used.
+
+    Returns:
+        sequence (str): The escape sequence, empty if nothing needs changing.
+
+    """
+    if current == target and not reset:
+        return ""
+    full = None
+    if reset is not False and SGR_UNKNOWN not in target:
+        full = sgr_params(target)
+        if reset:
+            return "\033[%sm" % ";".join(full)
+    diff = []
+    for flag, was, (on, off) in zip(target[:4], current[:4], _SGR_FLAG_CODES):
+        if flag is not SGR_UNKNOWN and flag != was:
+            diff.append(on if flag else off)
+    for color, was, default in zip(target[4:], current[4:], ("39", "49")):
+        if color is not SGR_UNKNOWN and color != was:
+            diff.append(color or default)
+    if full is not None and len(";".join(full)) <= len(";".join(diff)):
+        diff = full
+    if not diff:
+        return ""
+    return "\033[%sm" % ";".join(diff)
+
+
+def _html_color(color, layer, hilite=False):
+    """
+    Build the HTML class or style for a color from an SGR state.
+
+    Args:
+        color (str): The SGR parameters selecting the color.
+        layer (str): "fg" or "bg".
+        hilite (bool): If a 16-color foreground should be the bright variant.
+
+    Returns:
+        kind (str): "class" or "style".
+        value (str): The class name or style declaration.
+
+    """
+    codes = color.split(";")
+    if len(codes) == 5:
+        value = "#%02x%02x%02x" % tuple(int(code) for code in codes[2:])
+        return "style", "%s:%s" % ("color" if layer == "fg" else "background-color", value)
+    if len(codes) == 3:
+        return "class", "ansi-%s-%s" % (layer, codes[2])
+    code = int(color)
+    if code >= 90:
+        index = code % 10 + 8
+    else:
+        index = code % 10 + (8 if hilite else 0)
+    return "class", "ansi-%s-%i" % (layer, index)
+
+
+def _html_attributes(state):
+    """
+    Build the attributes of the HTML span showing text in an SGR state.
+
+    Args:
+        state (tuple): The state. Fields may not be `SGR_UNKNOWN`.
+
+    Returns:
+        attributes (str): The attributes, empty for default text.
+
+    """
+    hilite, underline, blink, inverse, fg, bg = state
+    classes, styles = [], []
+    bright = hilite and fg is not None and len(fg) == 2 and fg[0] == "3"
+    if hilite and not bright:
+        classes.append("ansi-bold")
+    for flag, name in ((underline, "ansi-underline"), (blink, "ansi-blink"), (inverse, "ansi-inverse")):
+        if flag:
+            classes.append(name)
+    if inverse:
+        fg, bg = bg, fg
+    for color, layer in ((fg, "fg"), (bg, "bg")):
+        if color:
+            kind, value = _html_color(color, layer, bright and color is state[4])
+            (classes if kind == "class" else styles).append(value)
+    attributes = []
+    if classes:
+        attributes.append('class="%s"' % " ".join(classes))
+    if styles:
+        attributes.append('style="%s"' % ";".join(styles))
+    return " ".join(attributes)
+
+
+def _reset_mode(dirty, reset_pending):
+    """
+    Pick the `reset` argument for `sgr_transition` while minimizing. Once
+    untracked attributes are active (`dirty`) a reset must only be sent when the
+    original sent one.
+
+    """
+    if not dirty:
+        return None
+    return bool(reset_pending)
+
+
+def minimize_sgr(string):
+    """
+    Remove redundant SGR sequences from already parsed text. The terminal state
+    is tracked through the string and a change is only sent right before the
+    text it affects - codes that are superseded before any text, codes that
+    re-select what is already active and color changes only spanning spaces
+    are dropped, and runs of adjacent codes are merged into one sequence.
+    The terminal is left in the same state as the original would leave it.
+
+    Args:
+        string (str): Text containing raw ANSI sequences.
+
+    Returns:
+        string (str): The equivalent, shorter text.
+
+    """
+    if "\033[" not in string:
+        return string
+    parts = _SGR_RE.split(string)
+    output = [parts[0]]
+    current = target = SGR_START
+    reset_pending = dirty = False
+    for index in range(1, len(parts), 2):
+        params, text = parts[index], parts[index + 1]
+        previous = target
+        target, reset, unknown = apply_sgr(target, params)
+        if unknown:
+            # leave anything we can't model to the terminal, in the original order
+            if params.split(";")[0] not in ("0", "", "00"):
+                output.append(sgr_transition(current, previous, _reset_mode(dirty, reset_pending)))
+            output.append("\033[%sm" % params)
+            current, reset_pending, dirty = target, False, True
+        else:
+            reset_pending = reset_pending or reset
+        force = _reset_mode(dirty, reset_pending)
+        if not text or (current == target and not force):
+            output.append(text)
+            continue
+        body = text if force else text.lstrip(_SGR_SPACE)
+        change = sgr_transition(current, target, force)
+        if len(body) < len(text):
+            # blank space only shows the background, underline and inverse, so
+            # the rest can wait until the first visible character if that's shorter.
+            # an underline is drawn in the foreground color, and inverse shows
+            # every attribute, so those keep more of the change. either may be
+            # on already when the flag isn't known, such as at the start.
+            if target[3] is not False:
+                shown = (0, 1, 2, 3, 4, 5)
+            elif target[1] is not False:
+                shown = (0, 1, 3, 4, 5)
+            else:
+                shown = (1, 3, 5)
+            spaces = tuple(
+                want if slot in shown or have is SGR_UNKNOWN else have
+                for slot, (have, want) in enumerate(zip(current, target))
+            )
+            first = sgr_transition(current, spaces, False if dirty else None)
+            second = sgr_transition(spaces, target, force)
+            if len(first) + (len(second) if body else 0) < len(change):
+                output.append(first)
+                output.append(text[: len(text) - len(body)])
+                current, change = spaces, second
+            else:
+                body = text
+        if body:
+            output.append(change)
+            output.append(body)
+            current, reset_pending = target, False
+            dirty = dirty and not force
+    output.append(sgr_transition(current, target, _reset_mode(dirty, reset_pending)))
+    return "".join(output)
+
+
 def _spacing_preflight(func):
     """
     This wrapper function is used to do some preflight checks on
@@ -1302,16 +1892,32 @@ class ANSIString(str, metaclass=ANSIMeta):
                     ANSIString('up, right, left, down')
 
         """
-        result = ANSIString("")
-        last_item = None
+        # Gathering the parts and concatenating once keeps this linear; adding
+        # them up one by one copies the growing index lists every time.
+        separator = None
+        raw_parts, clean_parts = [], []
+        code_indexes, char_indexes = [], []
+        offset = 0
         for item in iterable:
-            if last_item is not None:
-                result += self._raw_string
             if not isinstance(item, ANSIString):
                 item = ANSIString(item)
-            result += item
-            last_item = item
-        return result
+            if separator is None:
+                separator = ANSIString(self._raw_string)
+                parts = (item,)
+            else:
+                parts = (separator, item)
+            for part in parts:
+                raw_parts.append(part._raw_string)
+                clean_parts.append(part._clean_string)
+                code_indexes.extend(self._shifter(part._code_indexes, offset))
+                char_indexes.extend(self._shifter(part._char_indexes, offset))
+                offset += len(part._raw_string)
+        return ANSIString(
+            "".join(raw_parts),
+            code_indexes=code_indexes,
+            char_indexes=char_indexes,
+            clean_string="".join(clean_parts),
+        )
 
     def _filler(self, char, amount):
         """
@@ -0,0 +1,132 @@
+"""
+Batches database lookups made from async code. Rendering a list of entities tends to look up
+related rows for each entity in turn; with a DataLoader each render just awaits load(key),
+and every key asked for in the same event loop tick is fetched together with one query.
+"""
+import asyncio
+
+
+class DataLoader:
+    """
+    Collects keys requested with load() and resolves them with one call to a batch function.
+    Results are cached for the loader's lifetime, so a loader should only live as long as
+    the request or render that uses it.
+    """
+
+    def __init__(self, batch_func, runner=None, default=None):
+        """
+        Args:
+            batch_func (callable): Called with a list of keys, returns a dict of results by
+                key. It runs off the event loop, so it may query the database.
+            runner (callable, optional): Coroutine function that runs batch_func with the
+                keys, such as DatabaseService.read. Called directly if not given.
+            default (callable, optional): Makes the result for keys batch_func didn't
+                return, such as list. Those keys resolve to None if not given.
+        """
+        self.batch_func = batch_func
+        self.runner = runner
+        self.default = default
+        self.cache = dict()
+        self.queue = dict()
+        self.dispatching = False
+
+    def load(self, key):
+        """
+        Request one key.
+
+        Args:
+            key (hashable): The key, usually an Entity id.
+
+        Returns:
+            future (Future): Await for the result.
+        """
+        if (future := self.cache.get(key, None)) is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        self.cache[key] = self.queue[key] = future = loop.create_future()
+        if not self.dispatching:
+            self.dispatching = True
+            # run after everything else ready this tick has had the chance to load() too.
+            loop.call_soon(lambda: asyncio.ensure_future(self.dispatch()))
+        return future
+
+    async def load_many(self, keys):
+        return await asyncio.gather(*[self.load(key) for key in keys])
+
+    def prime(self, key, value):
+        """
+        Provide a result that's already known, so it won't be loaded.
+        """
+        if key not in self.cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self.cache[key] = future
+
+    def clear(self, key=None):
+        """
+        Forget a cached result, or all of them.
+        """
+        if key is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(key, None)
+
+    async def dispatch(self):
+        queue, self.queue = self.queue, dict()
+        self.dispatching = False
+        keys = list(queue)
+        try:
+            if self.runner:
+                results = await self.runner(self.batch_func, keys)
+            else:
+                results = self.batch_func(keys)
+        except Exception as err:
+            for key, future in queue.items():
+                self.cache.pop(key, None)
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for key, future in queue.items():
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_result(self.default() if self.default else None)
+
+
+def group_by(queryset, field):
+    """
+    Make a batch function that fetches the rows of a queryset whose field is one of the
+    keys, grouped into a list per key.
+
+    Args:
+        queryset (QuerySet): The rows to pick from, such as LoginRecord.objects.all().
+        field (str): The field compared to the keys, such as 'entity_id'.
+
+    Returns:
+        batch_func (callable): For a DataLoader.
+    """
+    def batch_func(keys):
+        found = dict()
+        for row in queryset.filter(**{f"{field}__in": keys}):
+            found.setdefault(getattr(row, field), list()).append(row)
+        return found
+    return batch_func
+
+
+def key_by(queryset, field='pk'):
+    """
+    Make a batch function that fetches the rows of a queryset whose field is one of the
+    keys, one row per key.
+
+    Args:
+        queryset (QuerySet): The rows to pick from.
+        field (str): The unique field compared to the keys.
+
+    Returns:
+        batch_func (callable): For a DataLoader.
+    """
+    def batch_func(keys):
+        return {getattr(row, field): row for row in queryset.filter(**{f"{field}__in": keys})}
+    return batch_func
@@ -116,13 +116,30 @@ appear on both sides of the table string.
 
 from mudslide.settings import settings
 from textwrap import TextWrapper
-from copy import deepcopy, copy
+import functools
+import hashlib
+import re
+from collections import OrderedDict, defaultdict
+from copy import copy
+from itertools import chain, islice
 from honahlee.utils.misc import is_iter
-from mudslide.utils.ansi import ANSIString
-from mudslide.utils.misc import display_len as d_len
+from mudslide.utils.ansi import (
+    ANSIString,
+    SGR_DEFAULT,
+    SGR_UNKNOWN,
+    scan_sgr,
+    sgr_transition,
+)
+from mudslide.utils.misc import char_width, display_len as d_len
 
 _DEFAULT_WIDTH = settings.CLIENT_DEFAULT_WIDTH
 
+# Rendered tables of EvTables created with `cache=True`, keyed by a hash of
+# their content and options. Entries are (rendered string, tags).
+_RENDER_CACHE = OrderedDict()
+_RENDER_CACHE_SIZE = 500
+_RENDER_CACHE_TAGS = defaultdict(set)
+
 
 def _to_ansi(obj):
     """
@@ -139,6 +156,57 @@ def _to_ansi(obj):
 
 
 _whitespace = "\t\n\x0b\x0c\r "
+_WORD_RE = re.compile(r"\S+")
+
+# display widths of border, corner and fill strings, which are few and reused
+# by every cell of a table.
+_WIDTH_CACHE = dict()
+_WIDTH_CACHE_SIZE = 1000
+
+
+def _cached_len(text):
+    """
+    Display width of a short, often repeated string like a border character.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        width (int): The display width.
+
+    """
+    key = (isinstance(text, ANSIString), str(text))
+    width = _WIDTH_CACHE.get(key, None)
+    if width is None:
+        if len(_WIDTH_CACHE) >= _WIDTH_CACHE_SIZE:
+            _WIDTH_CACHE.clear()
+        width = _WIDTH_CACHE[key] = d_len(text)
+    return width
+
+
+def _is_plain(char):
+    """
+    Check if a fill or pad character is ordinary text, so it can be added to
+    plain strings without changing what the result parses to.
+
+    """
+    return type(char) is str and char.isascii() and _cached_plain(char)
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_plain(char):
+    return str(ANSIString(char)) == char
+
+
+def _plain_ansi(text):
+    """
+    Wrap a string known to have no markup or escape codes in an ANSIString,
+    skipping the parsing.
+
+    """
+    return ANSIString(
+        text, code_indexes=[], char_indexes=list(range(len(text))), clean_string=text
+    )
 
 
 class ANSITextWrapper(TextWrapper):
@@ -147,127 +215,191 @@ class ANSITextWrapper(TextWrapper):
     in it.  It overloads the standard library `TextWrapper` class and
     is used internally in `EvTable` and has no public methods.
 
-    """
+    Break points are found on the clean text and the escape codes are put
+    back by their position in the raw string, so no ANSIStrings are made for
+    the words in between. Whitespace between words becomes a single space and
+    characters are measured by their display width. Lines after the first
+    start with the codes needed to restore the colors carried over from the
+    line before.
 
-    def _munge_whitespace(self, text):
-        """_munge_whitespace(text : string) -> string
+    """
 
-        Munge whitespace in text: expand tabs and convert all other
-        whitespace characters to spaces.  Eg. " foo\tbar\n\nbaz"
-        becomes " foo    bar  baz".
+    def wrap(self, text):
         """
-        return text
+        Wrap a single paragraph of text.
+
+        Args:
+            text (str): The text to wrap.
+
+        Returns:
+            lines (list): The wrapped lines, as ANSIStrings.
 
-    # TODO: Ignore expand_tabs/replace_whitespace until ANSIString handles them.
-    # - don't remove this code. /Griatch
-    #        if self.expand_tabs:
-    #            text = text.expandtabs()
-    #        if self.replace_whitespace:
-    #            if isinstance(text, str):
-    #                text = text.translate(self.whitespace_trans)
-    #        return text
-
-    def _split(self, text):
-        """_split(text : string) -> [string]
-
-        Split the text to wrap into indivisible chunks.  Chunks are
-        not quite the same as words; see _wrap_chunks() for full
-        details.  As an example, the text
-          Look, goof-ball -- use the -b option!
-        breaks into the following chunks:
-          'Look,', ' ', 'goof-', 'ball', ' ', '--', ' ',
-          'use', ' ', 'the', ' ', '-b', ' ', 'option!'
-        if break_on_hyphens is True, or in:
-          'Look,', ' ', 'goof-ball', ' ', '--', ' ',
-          'use', ' ', 'the', ' ', '-b', ' ', option!'
-        otherwise.
-        """
-        # NOTE-PYTHON3: The following code only roughly approximates what this
-        #               function used to do. Regex splitting on ANSIStrings is
-        #               dropping ANSI codes, so we're using ANSIString.split
-        #               for the time being.
-        #
-        #               A less hackier solution would be appreciated.
-        chunks = _to_ansi(text).split()
-
-        chunks = [chunk + " " for chunk in chunks if chunk]  # remove empty chunks
-
-        if len(chunks) > 1:
-            chunks[-1] = chunks[-1][0:-1]
-
-        return chunks
-
-    def _wrap_chunks(self, chunks):
-        """_wrap_chunks(chunks : [string]) -> [string]
-
-        Wrap a sequence of text chunks and return a list of lines of
-        length 'self.width' or less.  (If 'break_long_words' is false,
-        some lines may be longer than this.)  Chunks correspond roughly
-        to words and the whitespace between them: each chunk is
-        indivisible (modulo 'break_long_words'), but a line break can
-        come between any two chunks.  Chunks should not have internal
-        whitespace; ie. a chunk is either all whitespace or a "word".
-        Whitespace chunks will be removed from the beginning and end of
-        lines, but apart from that whitespace is preserved.
         """
-        lines = []
         if self.width <= 0:
             raise ValueError("invalid width %r (must be > 0)" % self.width)
+        text = _to_ansi(text)
+        clean = text._clean_string
+        if clean.isascii():
+            widths = None
+        else:
+            widths = list(map(char_width, clean))
 
-        # Arrange in reverse order so items can be efficiently popped
-        # from a stack of chucks.
+        # chunks are [start, end, space] - a word as a range of the clean text,
+        # and if a space follows it.
+        chunks = [[match.start(), match.end(), True] for match in _WORD_RE.finditer(clean)]
+        if chunks:
+            chunks[-1][2] = False
         chunks.reverse()
 
+        lines = []
         while chunks:
-
-            # Start the list of chunks that will make up the current line.
-            # cur_len is just the length of all the chunks in cur_line.
             cur_line = []
             cur_len = 0
-
-            # Figure out which static string will prefix this line.
-            if lines:
-                indent = self.subsequent_indent
-            else:
-                indent = self.initial_indent
-
-            # Maximum width for this line.
+            indent = self.subsequent_indent if lines else self.initial_indent
             width = self.width - d_len(indent)
 
-            # First chunk on line is whitespace -- drop it, unless this
-            # is the very beginning of the text (ie. no lines started yet).
-            if self.drop_whitespace and chunks[-1].strip() == "" and lines:
+            # a blank remainder of a broken word starting a line is dropped
+            if self.drop_whitespace and chunks[-1][0] == chunks[-1][1] and lines:
                 del chunks[-1]
 
             while chunks:
-                l = d_len(chunks[-1])
-
-                # Can at least squeeze this chunk onto the current line.
-                if cur_len + l <= width:
+                start, end, space = chunks[-1]
+                length = self._span_width(widths, start, end) + space
+                if cur_len + length <= width:
                     cur_line.append(chunks.pop())
-                    cur_len += l
-
-                # Nope, this line is full.
+                    cur_len += length
                 else:
                     break
 
-            # The current line is full, and the next chunk is too big to
-            # fit on *any* line (not just this one).
-            if chunks and d_len(chunks[-1]) > width:
-                self._handle_long_word(chunks, cur_line, cur_len, width)
+            if chunks:
+                start, end, space = chunks[-1]
+                if self._span_width(widths, start, end) + space > width:
+                    self._break_chunk(clean, widths, chunks, cur_line, cur_len, width)
 
-            # If the last chunk on this line is all whitespace, drop it.
-            if self.drop_whitespace and cur_line and cur_line[-1].strip() == "":
+            if self.drop_whitespace and cur_line and cur_line[-1][0] == cur_line[-1][1]:
                 del cur_line[-1]
 
-            # Convert current line back to a string and store it in list
-            # of all lines (return value).
             if cur_line:
-                l = ""
-                for w in cur_line:  # ANSI fix
-                    l += w  #
-                lines.append(indent + l)
-        return lines
+                lines.append((indent, cur_line))
+
+        return [
+            self._build_line(text, indent, pieces, index == 0, index == len(lines) - 1)
+            for index, (indent, pieces) in enumerate(lines)
+        ]
+
+    def fill(self, text):
+        """
+        Wrap a single paragraph of text and join the lines.
+
+        Args:
+            text (str): The text to fill.
+
+        Returns:
+            text (ANSIString): The filled text.
+
+        """
+        return ANSIString("\n").join(self.wrap(text))
+
+    @staticmethod
+    def _span_width(widths, start, end):
+        """
+        Display width of a range of the clean text.
+
+        """
+        if widths is None:
+            return end - start
+        return sum(widths[start:end])
+
+    def _break_chunk(self, clean, widths, chunks, cur_line, cur_len, width):
+        """
+        Handle a chunk too long to fit on any line, like
+        `TextWrapper._handle_long_word` but counting display width.
+
+        """
+        space_left = 1 if width < 1 else width - cur_len
+        if self.break_long_words:
+            start, end, space = chunks[-1]
+            cut, used = start, 0
+            while cut < end:
+                step = 1 if widths is None else widths[cut]
+                if used + step > space_left:
+                    break
+                used += step
+                cut += 1
+            if cut == start and not cur_line:
+                # a wide character on a narrow line, take it anyway
+                cut += 1
+            if self.break_on_hyphens and (end - start) + space > space_left:
+                # break after last hyphen, but only if there are non-hyphens before it
+                hyphen = clean.rfind("-", start, cut)
+                if hyphen > start and clean[start:hyphen].strip("-"):
+                    cut = hyphen + 1
+            cur_line.append([start, cut, False])
+            chunks[-1] = [cut, end, space]
+        elif not cur_line:
+            cur_line.append(chunks.pop())
+
+    @staticmethod
+    def _build_line(text, indent, pieces, first, last):
+        """
+        Assemble the raw string of a wrapped line from ranges of the clean
+        text, with the escape codes that go with them.
+
+        Args:
+            text (ANSIString): The text being wrapped.
+            indent (str): Indent to start the line with.
+            pieces (list): The [start, end, space] ranges on the line.
+            first (bool): If this is the first line.
+            last (bool): If this is the last line.
+
+        Returns:
+            line (ANSIString): The line.
+
+        """
+        raw = text._raw_string
+        char_indexes = text._char_indexes
+        total = len(char_indexes)
+
+        def position(index):
+            # raw position of a clean character, or the end of the raw string
+            return char_indexes[index] if index < total else len(raw)
+
+        def codes(start, end, clean_start, clean_end):
+            # raw[start:end] without the clean characters clean_start:clean_end in it
+            found = []
+            for index in range(clean_start, clean_end):
+                found.append(raw[start : char_indexes[index]])
+                start = char_indexes[index] + 1
+            found.append(raw[start:end])
+            return "".join(found)
+
+        parts = [indent]
+        begin = pieces[0][0]
+        if first:
+            parts.append(codes(0, position(begin), 0, begin))
+        else:
+            state = scan_sgr(raw, end=position(begin))
+            state = tuple(
+                default if value is SGR_UNKNOWN else value
+                for value, default in zip(state, SGR_DEFAULT)
+            )
+            parts.append(sgr_transition(SGR_DEFAULT, state))
+
+        after, after_clean = position(begin), begin
+        for start, end, space in pieces:
+            parts.append(codes(after, position(start), after_clean, start))
+            if end > start:
+                parts.append(raw[position(start) : char_indexes[end - 1] + 1])
+                after, after_clean = char_indexes[end - 1] + 1, end
+            else:
+                after, after_clean = position(start), start
+            if space:
+                parts.append(raw[after : char_indexes[end]])
+                parts.append(" ")
+                after, after_clean = char_indexes[end] + 1, end + 1
+        if last:
+            parts.append(codes(after, len(raw), after_clean, total))
+        return ANSIString("".join(parts), decoded=True)
 
 
 # -- Convenience interface ---------------------------------------------
@@ -442,9 +574,7 @@ class EvCell(object):
         self.align = kwargs.get("align", "l")
         self.valign = kwargs.get("valign", "c")
 
-        self.data = self._split_lines(_to_ansi(data))
-        self.raw_width = max(d_len(line) for line in self.data)
-        self.raw_height = len(self.data)
+        self._set_data(data)
 
         # this is extra trimming required for cels in the middle of a table only
         self.trim_horizontal = 0
@@ -473,6 +603,38 @@ class EvCell(object):
         # prepare data
         # self.formatted = self._reformat()
 
+    def _set_data(self, data):
+        """
+        Store new cell data and measure it. The measurements are kept so
+        the table can size its columns without formatting every cell.
+
+        Args:
+            data (str): The un-padded data of the entry.
+
+        """
+        self.data = self._split_lines(_to_ansi(data))
+        # plain cells have no markup and only narrow characters, so their
+        # display width is simply their length
+        self._plain = all(
+            line._raw_string == line._clean_string and line._clean_string.isascii()
+            for line in self.data
+        )
+        if self._plain:
+            self._line_widths = [len(line) for line in self.data]
+        else:
+            self._line_widths = [d_len(line) for line in self.data]
+        self.raw_width = max(self._line_widths)
+        self.raw_height = len(self.data)
+        self._fitted = (None, None)
+        self.formatted = None
+
+    def _len(self, text):
+        """
+        Display width of a line of this cell's data.
+
+        """
+        return len(text) if self._plain else d_len(text)
+
     def _crop(self, text, width):
         """
         Apply cropping of text.
@@ -492,7 +654,21 @@ class EvCell(object):
         Apply all EvCells' formatting operations.
 
         """
-        data = self._border(self._pad(self._valign(self._align(self._fit_width(self.data)))))
+        data = self._fit_width(self.data)
+        if (
+            self._plain
+            and not self.enforce_size
+            and not 0 < self.width < self.raw_width
+            and all(
+                _is_plain(char)
+                for char in (self.hpad_char, self.vpad_char, self.hfill_char, self.vfill_char)
+            )
+        ):
+            # fast path for plain, unwrapped cells: align and pad ordinary strings
+            # and only make ANSIStrings of the finished lines
+            lines = self._pad(self._valign(self._align([line._clean_string for line in data])))
+            return self._border([_plain_ansi(line) for line in lines])
+        data = self._border(self._pad(self._valign(self._align(data))))
         return data
 
     def _split_lines(self, text):
@@ -521,11 +697,29 @@ class EvCell(object):
             This also updates `raw_width`.
 
 
+        """
+        if data is self.data:
+            # the wrapping only depends on these, so it's kept between reformats
+            key = (self.width, self.height, self.enforce_size, self.crop_string)
+            if self._fitted[0] == key:
+                return list(self._fitted[1])
+            if not self.enforce_size and not 0 < self.width < self.raw_width:
+                adjusted_data = list(data)
+            else:
+                adjusted_data = self._fit_lines(data)
+            self._fitted = (key, adjusted_data)
+            return list(adjusted_data)
+        return self._fit_lines(data)
+
+    def _fit_lines(self, data):
+        """
+        Does the actual work of `_fit_width`.
+
         """
         width = self.width
         adjusted_data = []
         for line in data:
-            if 0 < width < d_len(line):
+            if 0 < width < self._len(line):
                 # replace_whitespace=False, expand_tabs=False is a
                 # fix for ANSIString not supporting expand_tabs/translate
                 adjusted_data.extend(
@@ -568,7 +762,7 @@ class EvCell(object):
             text (str): Centered text.
 
         """
-        excess = width - d_len(text)
+        excess = width - self._len(text)
         if excess <= 0:
             return text
         if excess % 2:
@@ -607,13 +801,13 @@ class EvCell(object):
                     if line.startswith(" ") and not line.startswith("  ")
                     else line
                 )
-                + hfill_char * (width - d_len(line))
+                + hfill_char * (width - self._len(line))
                 for line in data
             ]
             return lines
         elif align == "r":
             return [
-                hfill_char * (width - d_len(line))
+                hfill_char * (width - self._len(line))
                 + (
                     " " + line.rstrip(" ")
                     if line.endswith(" ") and not line.endswith("  ")
@@ -744,7 +938,16 @@ class EvCell(object):
             natural_height (int): Height of cell.
 
         """
-        return len(self.formatted)  # if self.formatted else 0
+        if self.formatted is not None:
+            return len(self.formatted)
+        # valign pads the data up to the cell height but never crops it
+        return (
+            max(len(self._fit_width(self.data)), self.height)
+            + self.pad_top
+            + self.pad_bottom
+            + self.border_top
+            + self.border_bottom
+        )
 
     def get_width(self):
         """
@@ -754,7 +957,48 @@ class EvCell(object):
             natural_width (int): Width of cell.
 
         """
-        return d_len(self.formatted[0])  # if self.formatted else 0
+        if self.formatted is None:
+            width = self._natural_width()
+            if width is not None:
+                return width
+        return d_len(self.get()[0])
+
+    def _natural_width(self):
+        """
+        Work out the width of the first formatted line without formatting
+        the cell. This is possible whenever all data lines are padded to
+        exactly the cell width, which is the common case.
+
+        Returns:
+            width (int or None): The width, or None if the cell must be
+                formatted to know.
+
+        """
+        if self.width <= 0 or self.enforce_size:
+            return None
+        if self.raw_width > self.width and not self._plain:
+            # wrapped lines of wide characters may not fill the width exactly
+            return None
+        for char in (self.hpad_char, self.vpad_char, self.hfill_char, self.vfill_char):
+            if char != " " and _cached_len(char) != 1:
+                return None
+        left = _cached_len(self.border_left_char * self.border_left)
+        right = _cached_len(self.border_right_char * self.border_right)
+        if self.border_top:
+            # the first line is the top border
+            cwidth = (
+                self.width
+                + self.pad_left
+                + self.pad_right
+                + max(0, self.border_left - 1)
+                + max(0, self.border_right - 1)
+            )
+            return (
+                (_cached_len(self.corner_top_left_char) if left else 0)
+                + cwidth * _cached_len(self.border_top_char)
+                + (_cached_len(self.corner_top_right_char) if right else 0)
+            )
+        return left + self.pad_left + self.width + self.pad_right + right
 
     def replace_data(self, data, **kwargs):
         """
@@ -768,9 +1012,7 @@ class EvCell(object):
             `EvCell.__init__`.
 
         """
-        self.data = self._split_lines(_to_ansi(data))
-        self.raw_width = max(d_len(line) for line in self.data)
-        self.raw_height = len(self.data)
+        self._set_data(data)
         self.reformat(**kwargs)
 
     def reformat(self, **kwargs):
@@ -896,25 +1138,25 @@ class EvCell(object):
             if self.height <= 0 < self.raw_height:
                 raise Exception("Cell height too small, no room for data.")
 
-        # reformat (to new sizes, padding, header and borders)
-        self.formatted = self._reformat()
+        # new sizes, padding, header and borders are applied the next time
+        # the formatted cell is needed
+        self.formatted = None
 
     def get(self):
         """
         Get data, padded and aligned in the form of a list of lines.
 
         """
-        self.formatted = self._reformat()
+        if self.formatted is None:
+            self.formatted = self._reformat()
         return self.formatted
 
     def __repr__(self):
-        self.formatted = self._reformat()
-        return str(ANSIString("<EvCel %s>" % self.formatted))
+        return str(ANSIString("<EvCel %s>" % self.get()))
 
     def __str__(self):
         "returns cell contents on string form"
-        self.formatted = self._reformat()
-        return str(ANSIString("\n").join(self.formatted))
+        return str(ANSIString("\n").join(self.get()))
 
 
 # EvColumn class
@@ -1008,6 +1250,20 @@ class EvColumn(object):
         """
         self._balance(**kwargs)
 
+    def copy(self):
+        """
+        Make a working copy of the column. The cells are copied shallowly -
+        their data is never modified in place, only replaced.
+
+        Returns:
+            column (EvColumn): The copy.
+
+        """
+        new_column = copy(self)
+        new_column.options = dict(self.options)
+        new_column.column = [copy(cell) for cell in self.column]
+        return new_column
+
     def reformat_cell(self, index, **kwargs):
         """
         reformat cell at given index, keeping column options if
@@ -1046,10 +1302,26 @@ class EvColumn(object):
 # Main Evtable class
 
 
+# Cell attributes that change how a cell renders, for the render cache key.
+_CELL_KEY_ATTRS = (
+    "align", "valign", "pad_left", "pad_right", "pad_top", "pad_bottom", "enforce_size",
+    "hpad_char", "vpad_char", "hfill_char", "vfill_char", "crop_string",
+    "border_left", "border_right", "border_top", "border_bottom",
+    "border_left_char", "border_right_char", "border_top_char", "border_bottom_char",
+    "corner_top_left_char", "corner_top_right_char", "corner_bottom_left_char",
+    "corner_bottom_right_char", "width", "height",
+)
+
+
 class EvTable(object):
     """
     The table class holds a list of EvColumns, each consisting of EvCells so
     that the result is a 2D matrix.
+
+    Rendering the whole table balances every cell at once and blocks while
+    it does: about half a second per thousand rows. For more than a few
+    hundred rows use `stream()`, which renders a row at a time and can be
+    paged, or render the table off the event loop.
     """
 
     def __init__(self, *args, **kwargs):
@@ -1106,6 +1378,11 @@ class EvTable(object):
                 of the table while allowing it to be smaller. Only if it grows wider than this
                 size will it be resized by expanding horizontally (or crop `height` is given).
                 This keyword has no meaning if `width` is set.
+            cache (bool, optional): Keep the rendered table in a shared cache, so any
+                table with identical content and options is served from memory. Default
+                is `False`.
+            cache_tags (iterable, optional): Tags for the cached render, which can be
+                dropped with `invalidate_render_cache(tag)` when the source data changes.
 
         Raises:
             Exception: If given erroneous input or width settings for the data.
@@ -1176,6 +1453,9 @@ class EvTable(object):
             kwargs.pop("corner_bottom_right_char", " " if pcorners else self.corner_char)
         )
 
+        self.cache = kwargs.pop("cache", False)
+        self.cache_tags = tuple(kwargs.pop("cache_tags", ()))
+
         self.width = kwargs.pop("width", None)
         self.height = kwargs.pop("height", None)
         self.evenwidth = kwargs.pop("evenwidth", False)
@@ -1329,7 +1609,7 @@ class EvTable(object):
         # we make all modifications on a working copy of the
         # actual table. This allows us to add columns/rows
         # and re-balance over and over without issue.
-        self.worktable = deepcopy(self.table)
+        self.worktable = [col.copy() for col in self.table]
         #        self._borders()
         #        return
         options = copy(self.options)
@@ -1512,6 +1792,7 @@ class EvTable(object):
                     raise Exception("Error in vertical align:\n %s" % msg)
 
         # calculate actual table width/height in characters
+        self.cwidths = cwidths
         self.cwidth = sum(cwidths)
         self.cheight = sum(cheights)
 
@@ -1530,6 +1811,112 @@ class EvTable(object):
             for iline in range(cell_height):
                 yield ANSIString("").join(_to_ansi(celldata[iline] for celldata in cell_data))
 
+    def stream(self, rows=(), sample=50, widths=None):
+        """
+        Render the table one row at a time, for tables too large to build
+        as a whole. Column widths are fixed up front, either as given or
+        from balancing the table with the first `sample` rows, so only
+        the rows being rendered are ever in memory.
+
+        Args:
+            rows (iterable, optional): Rows to add after those already in
+                the table. Each row is an iterable of cell data, and may be
+                produced lazily, like by a database query.
+            sample (int, optional): How many rows of `rows` to look at when
+                working out column widths. Later rows that don't fit are
+                wrapped.
+            widths (list, optional): Width of each column, borders and padding
+                included. If given, no sampling is done.
+
+        Yields:
+            line (ANSIString): The rendered table, one line at a time.
+
+        Notes:
+            A fixed table `height` is not supported when streaming.
+
+        """
+        rows = iter(rows)
+        sampled = []
+        if widths is None:
+            sampled = list(islice(rows, sample))
+            sampler = copy(self)
+            sampler.table = [col.copy() for col in self.table]
+            sampler.options = copy(self.options)
+            for row in sampled:
+                sampler.add_row(*row)
+            sampler._balance()
+            widths = sampler.cwidths
+        widths = list(widths)
+
+        def all_rows():
+            for iy in range(self.nrows):
+                yield self._stream_cells(
+                    [col[iy] if iy < len(col) else "" for col in self.table], len(widths)
+                )
+            for row in chain(sampled, rows):
+                yield self._stream_cells(row, len(widths))
+
+        # each row is rendered when the next one is known to exist, so the
+        # last one can get the bottom border
+        iy, pending = 0, None
+        for cells in all_rows():
+            if pending is not None:
+                yield from self._stream_row(pending, iy, iy + 1, widths)
+                iy += 1
+            pending = cells
+        if pending is not None:
+            yield from self._stream_row(pending, iy, iy, widths)
+
+    def _stream_cells(self, row, ncols):
+        """
+        Make the cells of a streamed row, cut or padded to the column count.
+
+        """
+        row = list(row)[:ncols]
+        row.extend("" for _ in range(ncols - len(row)))
+        cells = []
+        for ix, data in enumerate(row):
+            if isinstance(data, EvCell):
+                cells.append(copy(data))
+            else:
+                options = self.table[ix].options if ix < len(self.table) else self.options
+                cells.append(EvCell(data, **options))
+        return cells
+
+    def _stream_row(self, cells, iy, ny, widths):
+        """
+        Render one row of a streamed table the way `_balance` would, but
+        with fixed column widths.
+
+        Args:
+            cells (list): The EvCells of the row.
+            iy (int): Row index, 0 being the header if there is one.
+            ny (int): Index of the last row of the table, as far as known.
+            widths (list): Column widths.
+
+        Yields:
+            line (ANSIString): The rendered lines of the row.
+
+        """
+        nx = len(widths) - 1
+
+        def cell_options(ix, **kwargs):
+            options = copy(self.options)
+            options.update(kwargs)
+            if ix < len(self.table):
+                options.update(self.table[ix].options)
+            return options
+
+        for ix, cell in enumerate(cells):
+            cell.reformat(**cell_options(ix, **self._cellborders(ix, iy, nx, ny)))
+            cell.reformat(**cell_options(ix, width=widths[ix]))
+        height = max(cell.get_height() for cell in cells)
+        for ix, cell in enumerate(cells):
+            cell.reformat(**cell_options(ix, height=height))
+        cell_data = [cell.get() for cell in cells]
+        for iline in range(min(len(lines) for lines in cell_data)):
+            yield ANSIString("").join(_to_ansi(celldata[iline] for celldata in cell_data))
+
     def add_header(self, *args, **kwargs):
         """
         Add header to table. This is a number of texts to be put at
@@ -1725,10 +2112,107 @@ class EvTable(object):
         """
         return [line for line in self._generate_lines()]
 
+    def _render_key(self):
+        """
+        Build the render cache key: a hash of everything the rendered
+        table depends on - cell contents and formatting, table and column
+        options, border and theme characters and the width settings.
+
+        Returns:
+            key (bytes): The key.
+
+        """
+        digest = hashlib.blake2b(digest_size=20)
+
+        def feed(*values):
+            for value in values:
+                digest.update(str(value).encode("utf-8", "surrogatepass"))
+                digest.update(b"\x1f")
+
+        def feed_options(options):
+            for key in sorted(options):
+                feed(key, options[key])
+
+        feed(
+            self.border,
+            self.header,
+            self.header_line_char,
+            self.border_width,
+            self.corner_top_left_char,
+            self.corner_top_right_char,
+            self.corner_bottom_left_char,
+            self.corner_bottom_right_char,
+            self.width,
+            self.height,
+            self.maxwidth,
+            self.evenwidth,
+        )
+        feed_options(self.options)
+        for col in self.table:
+            digest.update(b"\x1e")
+            feed_options(col.options)
+            for cell in col:
+                digest.update(b"\x1d")
+                feed(*cell.data)
+                # formatting set on single cells, by reformat_cell() or EvCell data
+                digest.update(b"\x1c")
+                feed(*[getattr(cell, name, None) for name in _CELL_KEY_ATTRS])
+        return digest.digest()
+
     def __str__(self):
         """print table (this also balances it)"""
         # h = "12345678901234567890123456789012345678901234567890123456789012345678901234567890"
-        return str(str(ANSIString("\n").join([line for line in self._generate_lines()])))
+        if not self.cache:
+            return str(str(ANSIString("\n").join([line for line in self._generate_lines()])))
+
+        key = self._render_key()
+        if (found := _RENDER_CACHE.get(key, None)) is not None:
+            _RENDER_CACHE.move_to_end(key)
+            return found[0]
+        rendered = str(ANSIString("\n").join([line for line in self._generate_lines()]))
+        _RENDER_CACHE[key] = (rendered, self.cache_tags)
+        for tag in self.cache_tags:
+            _RENDER_CACHE_TAGS[tag].add(key)
+        if len(_RENDER_CACHE) > _RENDER_CACHE_SIZE:
+            old_key, (_, old_tags) = _RENDER_CACHE.popitem(last=False)
+            _forget_tags(old_key, old_tags)
+        return rendered
+
+
+def _forget_tags(key, tags):
+    """
+    Remove a render cache key from the tag index.
+
+    """
+    for tag in tags:
+        if (keys := _RENDER_CACHE_TAGS.get(tag, None)) is not None:
+            keys.discard(key)
+            if not keys:
+                del _RENDER_CACHE_TAGS[tag]
+
+
+def invalidate_render_cache(tag=None):
+    """
+    Drop cached table renders, for when the data they show has changed.
+
+    Args:
+        tag (str, optional): Only drop renders of tables created with this
+            tag in `cache_tags`. If not given, the whole cache is cleared.
+
+    Returns:
+        count (int): The number of renders dropped.
+
+    """
+    if tag is None:
+        count = len(_RENDER_CACHE)
+        _RENDER_CACHE.clear()
+        _RENDER_CACHE_TAGS.clear()
+        return count
+    keys = _RENDER_CACHE_TAGS.pop(tag, set())
+    for key in keys:
+        if (found := _RENDER_CACHE.pop(key, None)) is not None:
+            _forget_tags(key, found[1])
+    return len(keys)
 
 
 def _test():
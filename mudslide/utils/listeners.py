@@ -1,5 +1,7 @@
 import code
 import sys
+from collections import OrderedDict
+from itertools import islice
 
 class BaseListener:
     """
@@ -49,3 +51,121 @@ class PythonConsoleListener(code.InteractiveConsole, BaseListener):
             return
         result = self.push(raw)
         # self.write(str(result))
+
+
+class PagerListener(BaseListener):
+    """
+    Shows long output one page at a time with a --More-- prompt, for things like
+    streamed tables. Pages are rendered only when they are asked for and just a
+    few are kept around, so memory use doesn't grow with the size of the output.
+    The pager stays open on the last page, so earlier pages can still be reached,
+    until the user quits or presses Enter there. Output that fits on one page is
+    just sent.
+    """
+    page_cache_size = 5
+    prompt = "|w--More--|n (page {page}) [Enter] next, p prev, g <page> goto, q quit"
+    last_prompt = "|w--End--|n (page {page}) p prev, g <page> goto, [Enter] or q quit"
+
+    def __init__(self, connection, source, page_size=None):
+        """
+        Args:
+            connection: The connection to page output to.
+            source (callable): Returns an iterable of lines, like
+                `lambda: table.stream(rows)`. It is called again to start over
+                when a page that's no longer cached is needed.
+            page_size (int, optional): Lines per page. Defaults to the client's
+                screen height.
+        """
+        super().__init__(connection)
+        self.source = source
+        if page_size is None:
+            height = connection.scope.get('game_client', dict()).get('height', None) or 24
+            page_size = height - 1
+        self.page_size = max(page_size, 1)
+        self.pages = OrderedDict()
+        self.page = 0
+        self.last_page = None
+        self.lines = None
+        self.position = 0
+        self.carry = []
+
+    def _take(self):
+        """
+        Read the next page from the live source, peeking one line ahead to
+        know if it's the last one.
+        """
+        page = self.carry + list(islice(self.lines, self.page_size - len(self.carry)))
+        self.carry = list(islice(self.lines, 1))
+        if not self.carry:
+            self.last_page = self.position
+        self.position += 1
+        return page
+
+    def get_page(self, index):
+        """
+        Get the lines of a page, rendering it if it isn't cached.
+
+        Args:
+            index (int): Page number, starting from 0.
+
+        Returns:
+            lines (list or None): The lines, or None if there is no such page.
+        """
+        if index < 0 or (self.last_page is not None and index > self.last_page):
+            return None
+        if index in self.pages:
+            self.pages.move_to_end(index)
+            return self.pages[index]
+        if self.lines is None or index < self.position:
+            self.lines = iter(self.source())
+            self.position = 0
+            self.carry = []
+        page = None
+        while self.position <= index:
+            if self.last_page is not None and self.position > self.last_page:
+                return None
+            page = self._take()
+        self.pages[index] = page
+        if len(self.pages) > self.page_cache_size:
+            self.pages.popitem(last=False)
+        return page
+
+    async def show(self, index):
+        if (page := self.get_page(index)) is None:
+            self.connection.msg("There is no such page.")
+            return
+        self.page = index
+        text = '\n'.join(str(line) for line in page)
+        if self.last_page == 0:
+            self.connection.msg(text)
+            await self.stop()
+            return
+        self.connection.msg(f"{text}\n{self.current_prompt()}")
+
+    def on_last_page(self):
+        return self.last_page is not None and self.page >= self.last_page
+
+    def current_prompt(self):
+        return (self.last_prompt if self.on_last_page() else self.prompt).format(page=self.page + 1)
+
+    async def stop(self):
+        await self.app.services['input'].stop_listener(self.connection)
+
+    async def start(self):
+        await self.show(0)
+
+    async def process_input(self, raw, *args, **kwargs):
+        command, _, arg = raw.strip().lower().partition(' ')
+        if command in ('', 'n', 'next'):
+            if self.on_last_page():
+                await self.stop()
+            else:
+                await self.show(self.page + 1)
+        elif command in ('p', 'prev'):
+            await self.show(self.page - 1)
+        elif command in ('g', 'goto') and arg.strip().isdigit():
+            await self.show(int(arg) - 1)
+        elif command in ('q', 'quit'):
+            await self.stop()
+        else:
+            self.connection.msg(self.current_prompt())
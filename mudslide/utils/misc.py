@@ -1,13 +1,14 @@
-import textwrap
+from bisect import bisect_right
 from collections import defaultdict
-from unicodedata import east_asian_width
 from honahlee.utils.misc import to_str, inherits_from
 from django.core.validators import validate_email as django_validate_email
 from django.core.exceptions import ValidationError as DjangoValidationError
+from mudslide.utils.charwidth import WIDTH_RANGES as _WIDTH_RANGES
 
 def wrap(text, width=None, indent=0):
     """
-    Safely wrap text to a certain number of characters.
+    Safely wrap text to a certain number of characters. Color markup does not
+    count towards the width, and east-asian wide characters count double.
 
     Args:
         text (str): The text to wrap.
@@ -15,20 +16,66 @@ def wrap(text, width=None, indent=0):
         indent (int): How much to indent each line (with whitespace).
 
     Returns:
-        text (str): Properly wrapped text.
+        text (str): Properly wrapped text, as an ANSIString.
 
     """
+    # Would create circular import if in module root.
+    from mudslide.utils.evtable import ANSITextWrapper
+
     width = width if width else 78
     if not text:
         return ""
     indent = " " * indent
-    return to_str(textwrap.fill(text, width, initial_indent=indent, subsequent_indent=indent))
+    wrapper = ANSITextWrapper(width=width, initial_indent=indent, subsequent_indent=indent)
+    return to_str(wrapper.fill(text))
 
 
 # alias - fill
 fill = wrap
 
 
+# Ranges of characters that do not take up one column, and their starts for bisecting.
+_WIDTH_STARTS = [entry[0] for entry in _WIDTH_RANGES]
+
+
+def char_width(char):
+    """
+    Number of columns a single character takes up on a terminal.
+
+    Args:
+        char (str): The character.
+
+    Returns:
+        int: 0, 1 or 2.
+
+    """
+    codepoint = ord(char)
+    if codepoint < 0x300:
+        return 1
+    index = bisect_right(_WIDTH_STARTS, codepoint) - 1
+    if index >= 0:
+        start, end, width = _WIDTH_RANGES[index]
+        if codepoint <= end:
+            return width
+    return 1
+
+
+def text_width(text):
+    """
+    Number of columns plain text (without any markup) takes up on a terminal.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The visible width of the text.
+
+    """
+    if text.isascii():
+        return len(text)
+    return sum(map(char_width, text))
+
+
 def display_len(target):
     """
     Calculate the 'visible width' of text. This is not necessarily the same as the
@@ -44,14 +91,18 @@ def display_len(target):
 
     """
     # Would create circular import if in module root.
-    from mudslide.utils.ansi import ANSI_PARSER
-
+    from mudslide.utils.ansi import ANSI_PARSER, ANSIString
+
+    if isinstance(target, ANSIString):
+        # the clean text never changes, so the width is remembered on the string
+        width = getattr(target, "_display_width", None)
+        if width is None:
+            width = target._display_width = text_width(ANSI_PARSER.strip_mxp(target._clean_string))
+        return width
     if inherits_from(target, str):
-        # str or ANSIString
         target = ANSI_PARSER.strip_mxp(target)
         target = ANSI_PARSER.parse_ansi(target, strip_ansi=True)
-        extra_wide = ("F", "W")
-        return sum(2 if east_asian_width(char) in extra_wide else 1 for char in target)
+        return text_width(target)
     else:
         return len(target)
 
@@ -32,26 +32,26 @@ class BaseOption:
         self.default_value = default
         self.description = description
 
+    @property
+    def default(self):
+        return self.default_value
+
     def get(self, connection, ignore_temporary=False):
-        if self.key in connection.options and not ignore_temporary:
-            return connection.options[self.key]
-        if not connection.logged_in:
-            return self.default_value
-        acc = connection.get_account()
-        return acc.get_option(self)
+        return connection.options.get(self.key, ignore_temporary=ignore_temporary)
 
     def set(self, connection, value, temporary=False):
-        final_value = self.validate(connection, value)
+        final_value = self.validate(value, account=connection.get_account())
         if temporary:
-            connection.options[self.key] = final_value
+            connection.options.temporary[self.key] = final_value
         else:
             self.save(connection, final_value)
+        self.service.option_changed(connection, self.key)
         return final_value
 
     def save(self, connection, final_value):
         if not connection.logged_in:
             return
-        serialized = self.serialize(connection, final_value)
+        serialized = self.serialize(final_value)
         acc = connection.get_account()
         acc.save_option(self, serialized)
 
@@ -76,11 +76,14 @@ class BaseOption:
         """
         Serializes the save data for JSON Attribute storage.
 
+        Args:
+            value (any): The value to serialize.
+
         Returns:
             value (any): The value being serialized to JSON.
 
         """
-        pass
+        return value
 
     def validate(self, value, **kwargs):
         """
@@ -147,9 +150,6 @@ class Boolean(BaseOption):
             return "1 - On/True"
         return "0 - Off/False"
 
-    def serialize(self):
-        return self.value
-
     def deserialize(self, save_data):
         if not isinstance(save_data, bool):
             raise ValueError(f"{self.key} expected Boolean, got '{save_data}'")
@@ -182,8 +182,8 @@ class Timezone(BaseOption):
             raise ValueError(f"{self.key} expected Timezone Data, got '{save_data}'")
         return _TZ_DICT[save_data]
 
-    def serialize(self):
-        return str(self.value_storage)
+    def serialize(self, value):
+        return str(value)
 
 
 class UnsignedInteger(BaseOption):
@@ -227,8 +227,8 @@ class Duration(BaseOption):
             return datetime.timedelta(0, save_data, 0, 0, 0, 0, 0)
         raise ValueError(f"{self.key} expected Timedelta in seconds, got '{save_data}'")
 
-    def serialize(self):
-        return self.value_storage.seconds
+    def serialize(self, value):
+        return int(value.total_seconds())
 
 
 class Datetime(BaseOption):
@@ -240,8 +240,8 @@ class Datetime(BaseOption):
             return datetime.datetime.utcfromtimestamp(save_data)
         raise ValueError(f"{self.key} expected UTC Datetime in EPOCH format, got '{save_data}'")
 
-    def serialize(self):
-        return int(self.value_storage.strftime("%s"))
+    def serialize(self, value):
+        return int(value.strftime("%s"))
 
 
 class Future(Datetime):
@@ -252,3 +252,75 @@ class Future(Datetime):
 class Lock(Text):
     def validate(self, value, **kwargs):
         return validatorfuncs.lock(value, option_key=self.key, **kwargs)
+
+
+class OptionHandler:
+    """
+    Resolves the options of a connection. Values are looked up in layers: temporary values
+    set on this connection, then the logged-in account's saved values, then the Option's
+    default. Every layer is in memory, the account's values being loaded in one query
+    at login, so looking up an option never touches the database.
+
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.temporary = dict()
+
+    @property
+    def service(self):
+        return self.connection.app.services["option"]
+
+    async def load(self):
+        """
+        Load the saved options of the connection's account, if they aren't already.
+        """
+        if (account := self.connection.get_account()) is not None:
+            await self.service.load_account(account)
+
+    def get(self, key, default=None, ignore_temporary=False):
+        """
+        Get the current value of an option.
+
+        Args:
+            key (str): The option's name.
+            default (any, optional): Returned if there is no such option.
+            ignore_temporary (bool): Skip values set only on this connection.
+
+        Returns:
+            value (any): The option's value.
+
+        """
+        if not ignore_temporary and key in self.temporary:
+            return self.temporary[key]
+        if (account := self.connection.get_account()) is not None and key in account.options:
+            return account.options[key]
+        if (option := self.service.options.get(key, None)) is None:
+            return default
+        return option.default
+
+    def set(self, key, value, temporary=False):
+        """
+        Validate and set an option, either for this connection only or saved on the account.
+
+        Args:
+            key (str): The option's name.
+            value (str): User input for the new value.
+            temporary (bool): Only set it for this connection.
+
+        Returns:
+            value (any): The validated value.
+
+        """
+        return self.service.options[key].set(self.connection, value, temporary=temporary)
+
+    def clear_temporary(self, key):
+        """
+        Remove a temporary value, so the saved or default value applies again.
+
+        Args:
+            key (str): The option's name.
+
+        """
+        if self.temporary.pop(key, None) is not None:
+            self.service.option_changed(self.connection, key)
@@ -0,0 +1,54 @@
+"""
+SQLite connection profiles. A profile is a dict of pragmas run on every new connection,
+plus how long Django keeps connections open. The tuned profile uses WAL, so readers don't
+block the writer, and trades a little durability on power loss (synchronous=NORMAL) for
+far fewer fsyncs.
+"""
+from django.db.backends.signals import connection_created
+
+# Pragmas of the tuned profile.
+TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # 256MB of the file memory-mapped.
+    'mmap_size': 268435456,
+    # negative means KiB, so 64MB of page cache per connection.
+    'cache_size': -65536,
+    # milliseconds to wait on a lock before 'database is locked'.
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+_PROFILE = dict()
+
+
+def apply_pragmas(cursor, pragmas):
+    """
+    Run pragmas on a connection.
+
+    Args:
+        cursor (cursor): A cursor of the connection, DB-API or Django.
+        pragmas (dict): Pragma values by name.
+    """
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+
+
+def _connection_created(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not (pragmas := _PROFILE.get('pragmas', None)):
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
+
+
+def install_profile(profile):
+    """
+    Make every new SQLite connection Django opens use a profile's pragmas.
+
+    Args:
+        profile (dict): The profile, from the config's sqlite_profiles.
+    """
+    _PROFILE.clear()
+    _PROFILE.update(profile)
+    connection_created.connect(_connection_created, dispatch_uid='mudslide_sqlite_profile')
+
@@ -1,18 +1,192 @@
 import math, datetime
+from collections import OrderedDict
 
+from mudslide.settings import settings
 from mudslide.utils.evtable import EvTable
 from mudslide.utils.ansi import ANSIString
+from mudslide.utils.misc import display_len
+
+# Rendered headers, separators and footers, shared by all connections. Everything that
+# changes the result is in the key, so users with the same colors and screen width share
+# one rendering.
+_DECORATION_CACHE = OrderedDict()
+_DECORATION_CACHE_SIZE = 500
+
+# Compiled themes, keyed by the option values they were compiled from.
+_THEME_CACHE = OrderedDict()
+_THEME_CACHE_SIZE = 100
+
+
+class Theme:
+    """
+    A set of styling options compiled into ready-parsed pieces. Borders, corners, fills and
+    the like are parsed into ANSIStrings the first time they are asked for and reused after
+    that, so styling only has to join strings together. Themes are shared by every
+    connection with the same option values and must not be modified.
+
+    """
+
+    # Most distinct pieces kept before starting over.
+    max_pieces = 1000
+
+    def __init__(self, values):
+        """
+        Args:
+            values (tuple): (name, value) pairs of the options to compile.
+
+        """
+        self.key = values
+        self.values = dict(values)
+        self._pieces = dict()
+
+    def color(self, name):
+        """
+        The color code of a color option.
+
+        Args:
+            name (str): The option's name, like 'border_color'.
+
+        Returns:
+            color (str): The color code, without the leading |.
+
+        """
+        return self.values.get(name, "")
+
+    def parse(self, markup):
+        """
+        Parse markup into an ANSIString, reusing earlier results.
+
+        Args:
+            markup (str): Text with color markup.
+
+        Returns:
+            text (ANSIString): The parsed text.
+
+        """
+        found = self._pieces.get(markup, None)
+        if found is None:
+            if len(self._pieces) >= self.max_pieces:
+                self._pieces.clear()
+            found = self._pieces[markup] = ANSIString(markup)
+        return found
+
+    def border(self, text):
+        """
+        Text in the border color, as used for table borders.
+
+        Args:
+            text (str): The border characters.
+
+        Returns:
+            text (ANSIString): The colored text.
+
+        """
+        return self.parse(f"|{self.values['border_color']}{text}|n")
+
+    def fill(self, text):
+        """
+        Text in the border color, reset before and after, as used for decorations.
+
+        Args:
+            text (str): The fill or edge characters.
+
+        Returns:
+            text (ANSIString): The colored text.
+
+        """
+        return self.parse("|n|%s%s|n" % (self.values["border_color"], text))
+
+
+def compile_theme(values):
+    """
+    Get the compiled Theme for a set of option values.
+
+    Args:
+        values (tuple): (name, value) pairs of styling options.
+
+    Returns:
+        theme (Theme): The shared, compiled theme.
+
+    """
+    theme = _THEME_CACHE.get(values, None)
+    if theme is None:
+        theme = _THEME_CACHE[values] = Theme(values)
+        if len(_THEME_CACHE) > _THEME_CACHE_SIZE:
+            _THEME_CACHE.popitem(last=False)
+    else:
+        _THEME_CACHE.move_to_end(values)
+    return theme
 
 
 class Styler:
     app = None
 
+    # Used for any option the connection does not have a value for.
+    option_defaults = {
+        "border_color": "n",
+        "column_names_color": "G",
+        "header_text_color": "w",
+        "header_star_color": "m",
+        "header_fill": "=",
+        "separator_text_color": "w",
+        "separator_star_color": "m",
+        "separator_fill": "-",
+        "footer_text_color": "w",
+        "footer_star_color": "m",
+        "footer_fill": "=",
+    }
+
     def __init__(self, connection):
         self.connection = connection
-        self.cache = dict()
+        self._theme = None
+
+    @property
+    def options(self):
+        return self.connection.options
+
+    @property
+    def width(self):
+        """
+        The connection's screen width, as reported by NAWS or the client.
+        """
+        client = self.connection.scope.get("game_client", dict())
+        return client.get("width", None) or settings.CLIENT_DEFAULT_WIDTH
+
+    def option(self, name):
+        """
+        Look up one of the connection's options, falling back to the Styler's defaults.
+
+        Args:
+            name (str): The option's name.
+
+        Returns:
+            value (any): The option's value.
+
+        """
+        value = self.connection.options.get(name)
+        if value is None:
+            value = self.option_defaults.get(name, "")
+        return value
+
+    @property
+    def theme(self):
+        """
+        The connection's options compiled into a Theme. It is kept until invalidate_theme() is
+        called, which happens whenever the options are loaded or changed.
+        """
+        if self._theme is None:
+            values = tuple((name, self.option(name)) for name in self.option_defaults)
+            self._theme = compile_theme(values)
+        return self._theme
+
+    def invalidate_theme(self):
+        """
+        Forget the compiled Theme, so it is rebuilt from the options on next use.
+        """
+        self._theme = None
 
     def styled_columns(self, columns):
-        return f"|{self.connection.options.get('column_names_color')}{columns}|n"
+        return f"|{self.theme.color('column_names_color')}{columns}|n"
 
     def styled_table(self, *args, **kwargs):
         """
@@ -29,27 +203,17 @@ class Styler:
                 or incomplete and ready for use with `.add_row` or `.add_collumn`.
 
         """
-        border_color = self.connection.options.get("border_color")
-        column_color = self.connection.options.get("column_names_color")
+        theme = self.theme
+        column_color = theme.color("column_names_color")
 
         colornames = ["|%s%s|n" % (column_color, col) for col in args]
 
-        h_line_char = kwargs.pop("header_line_char", "~")
-        header_line_char = ANSIString(f"|{border_color}{h_line_char}|n")
-        c_char = kwargs.pop("corner_char", "+")
-        corner_char = ANSIString(f"|{border_color}{c_char}|n")
-
-        b_left_char = kwargs.pop("border_left_char", "||")
-        border_left_char = ANSIString(f"|{border_color}{b_left_char}|n")
-
-        b_right_char = kwargs.pop("border_right_char", "||")
-        border_right_char = ANSIString(f"|{border_color}{b_right_char}|n")
-
-        b_bottom_char = kwargs.pop("border_bottom_char", "-")
-        border_bottom_char = ANSIString(f"|{border_color}{b_bottom_char}|n")
-
-        b_top_char = kwargs.pop("border_top_char", "-")
-        border_top_char = ANSIString(f"|{border_color}{b_top_char}|n")
+        header_line_char = theme.border(kwargs.pop("header_line_char", "~"))
+        corner_char = theme.border(kwargs.pop("corner_char", "+"))
+        border_left_char = theme.border(kwargs.pop("border_left_char", "||"))
+        border_right_char = theme.border(kwargs.pop("border_right_char", "||"))
+        border_bottom_char = theme.border(kwargs.pop("border_bottom_char", "-"))
+        border_top_char = theme.border(kwargs.pop("border_top_char", "-"))
 
         table = EvTable(
             *colornames,
@@ -58,6 +222,7 @@ class Styler:
             border_left_char=border_left_char,
             border_right_char=border_right_char,
             border_top_char=border_top_char,
+            border_bottom_char=border_bottom_char,
             **kwargs,
         )
         return table
@@ -78,80 +243,81 @@ class Styler:
         Kwargs:
             header_text (str): Text to include in header.
             fill_character (str): This single character will be used to fill the width of the
-                display.
+                display. If not given, the `<mode>_fill` option is used.
             edge_character (str): This character caps the edges of the display.
             mode(str): One of 'header', 'separator' or 'footer'.
             color_header (bool): If the header should be colorized based on user options.
             width (int): If not given, the client's width will be used if available.
-            use_cache (bool): If True, will fetch generated text from a cache if available.
+            use_cache (bool): If True, will fetch generated text from the shared decoration cache
+                if available.
 
         Returns:
             string (str): The decorated and formatted text.
 
         """
+        theme = self.theme
+        border_color = theme.color("border_color")
+        text_color = theme.color(f"{mode}_text_color")
+        star_color = theme.color(f"{mode}_star_color")
+
+        if not fill_character:
+            fill_character = theme.values.get("%s_fill" % mode) or "-"
+        if not width:
+            width = self.width
+
         # this tuple is used for the cache key.
-        cache_id = (header_text, fill_character, edge_character, mode, color_header, width)
+        cache_id = (
+            mode,
+            header_text,
+            fill_character,
+            edge_character,
+            color_header,
+            (border_color, text_color, star_color),
+            width,
+        )
 
         # Retrieve from cache if relevant.
-        if use_cache:
-            if self.viewer:
-                if (found := self.cache.get(cache_id, None)):
-                    return found
-            else:
-                if (found := self.fallback_cache.get(cache_id, None)):
-                    return found
-
-        colors = dict()
-        colors["border"] = self.connection.options.get("border_color")
-        colors["headertext"] = self.connection.options.get(f"{mode}_text_color")
-        colors["headerstar"] = self.connection.options.get(f"{mode}_star_color")
+        if use_cache and (found := _DECORATION_CACHE.get(cache_id, None)):
+            _DECORATION_CACHE.move_to_end(cache_id)
+            return found
 
-        width = self.width
         if edge_character:
             width -= 2
 
         if header_text:
             if color_header:
                 header_text = ANSIString(header_text).clean()
-                header_text = ANSIString("|n|%s%s|n" % (colors["headertext"], header_text))
+                header_text = ANSIString("|n|%s%s|n" % (text_color, header_text))
             if mode == "header":
-                begin_center = ANSIString(
-                    "|n|%s<|%s* |n" % (colors["border"], colors["headerstar"])
-                )
-                end_center = ANSIString("|n |%s*|%s>|n" % (colors["headerstar"], colors["border"]))
+                begin_center = theme.parse("|n|%s<|%s* |n" % (border_color, star_color))
+                end_center = theme.parse("|n |%s*|%s>|n" % (star_color, border_color))
                 center_string = ANSIString(begin_center + header_text + end_center)
             else:
-                center_string = ANSIString("|n |%s%s |n" % (colors["headertext"], header_text))
+                center_string = ANSIString("|n |%s%s |n" % (text_color, header_text))
         else:
             center_string = ""
 
-        fill_character = self.connection.options.get("%s_fill" % mode)
-
-        remain_fill = width - len(center_string)
+        remain_fill = width - display_len(center_string)
         if remain_fill % 2 == 0:
             right_width = remain_fill / 2
             left_width = remain_fill / 2
         else:
             right_width = math.floor(remain_fill / 2)
             left_width = math.ceil(remain_fill / 2)
-        right_fill = ANSIString("|n|%s%s|n" % (colors["border"], fill_character * int(right_width)))
-        left_fill = ANSIString("|n|%s%s|n" % (colors["border"], fill_character * int(left_width)))
+        right_fill = theme.fill(fill_character * int(right_width))
+        left_fill = theme.fill(fill_character * int(left_width))
 
         if edge_character:
-            edge_fill = ANSIString("|n|%s%s|n" % (colors["border"], edge_character))
-            main_string = ANSIString(center_string)
-            final_send = (
-                    ANSIString(edge_fill) + left_fill + main_string + right_fill + ANSIString(edge_fill)
-            )
+            edge_fill = theme.fill(edge_character)
+            final_send = edge_fill + left_fill + ANSIString(center_string) + right_fill + edge_fill
         else:
             final_send = left_fill + ANSIString(center_string) + right_fill
 
         # After going through all of this trouble, cache the result.
         if use_cache:
-            if self.viewer:
-                self.cache[cache_id] = final_send
-            else:
-                self.fallback_cache[cache_id] = final_send
+            _DECORATION_CACHE[cache_id] = final_send
+            if len(_DECORATION_CACHE) > _DECORATION_CACHE_SIZE:
+                _DECORATION_CACHE.popitem(last=False)
 
         return final_send
 
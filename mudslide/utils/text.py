@@ -203,6 +203,44 @@ class Speech(object):
     def render(self, viewer=None):
         if not viewer:
             return ANSIString(self.demarkup())
+        return self.colorize(self.render_markup(), viewer)
+
+    def render_many(self, viewers):
+        """
+        Render the speech for many viewers at once. The message is parsed into a template
+        once, viewers are grouped by the colors that apply to them, and each group is
+        rendered once, so every extra viewer costs a handful of dictionary lookups.
+
+        Args:
+            viewers (iterable): The viewers, as accepted by render().
+
+        Returns:
+            renders (dict): The rendered text for each viewer. Viewers that share colors
+                share the same string.
+
+        """
+        template = None
+        plain = None
+        by_signature = dict()
+        results = dict()
+        for viewer in viewers:
+            if not viewer:
+                if plain is None:
+                    plain = ANSIString(self.demarkup())
+                results[viewer] = plain
+                continue
+            if template is None:
+                template = self.parse_template(self.render_markup())
+            signature = self.color_signature(template, viewer)
+            if (found := by_signature.get(signature, None)) is None:
+                found = by_signature[signature] = self.fill_template(template, signature)
+            results[viewer] = found
+        return results
+
+    def render_markup(self):
+        """
+        The speech as markup, before viewer-specific coloring.
+        """
         return_string = None
         if self.special_format == 0:
             return_string = f'{self.markup_name} {self.action_string}, "{self.markup_string}|n"'
@@ -217,8 +255,7 @@ class Speech(object):
         if self.mode == 'page' and len(self.targets) > 1:
             pref = f'(To {", ".join(self.targets)})'
             return_string = f'{pref} {return_string}'
-
-        return self.colorize(return_string, viewer)
+        return return_string
 
     def log(self):
         return_string = None
@@ -251,7 +288,18 @@ class Speech(object):
             return_string = f'{self.title} {return_string}'
         return ANSIString(return_string)
 
-    def colorize(self, message, viewer):
+    def viewer_colors(self, viewer):
+        """
+        Find the account a viewer sees as, and the speech colors it uses.
+
+        Args:
+            viewer (any): A connection or similar, or None.
+
+        Returns:
+            account (AccountEntity or None): The account.
+            colors (dict): Colors for quotes, speech, speaker, self and other. '' for none.
+
+        """
         viewer = viewer.get_account() if viewer and hasattr(viewer, 'get_account') else None
         colors = dict()
         styler = viewer.styler if viewer else athanor.STYLER(None)
@@ -259,40 +307,119 @@ class Speech(object):
             colors[op] = styler.options.get(f"{op}_{self.color_mode}", '')
             if colors[op] == 'n':
                 colors[op] = ''
+        return viewer, colors
+
+    def parse_template(self, message):
+        """
+        Split markup into a template of plain text, quote marks and names, so it can be
+        colored for any viewer without running the regexes again.
+
+        Args:
+            message (str): Markup as made by render_markup().
+
+        Returns:
+            template (tuple): The parts, as ('text', str), ('open', None), ('close', None) and
+                ('name', (obj, name)) pairs. obj is None for unknown names.
+
+        """
+        template = list()
+
+        def add_names(text):
+            start = 0
+            for found in self.re_name.finditer(text):
+                if found.start() > start:
+                    template.append(('text', text[start:found.start()]))
+                obj = self.controller.id_map.get(int(found.group("thing_id")), None)
+                template.append(('name', (obj, found.group("thing_name"))))
+                start = found.end()
+            if start < len(text):
+                template.append(('text', text[start:]))
+
+        start = 0
+        for found in self.re_speech.finditer(message):
+            add_names(message[start:found.start()])
+            template.append(('open', None))
+            add_names(found.group("found"))
+            template.append(('close', None))
+            start = found.end()
+        add_names(message[start:])
+        return tuple(template)
+
+    def color_signature(self, template, viewer):
+        """
+        Work out everything about a viewer that changes how a template is colored.
+
+        Args:
+            template (tuple): A template from parse_template().
+            viewer (any): The viewer.
+
+        Returns:
+            signature (tuple): The quote color, speech color, and the color of each distinct
+                name in the template, in order.
+
+        """
+        account, colors = self.viewer_colors(viewer)
+        names = dict()
+        for kind, value in template:
+            if kind == 'name' and value[0] not in names:
+                names[value[0]] = self.name_color(value[0], account, colors)
+        return colors["quotes"], colors["speech"], tuple(names.items())
+
+    def name_color(self, obj, account, colors):
+        """
+        The color a name is shown in for a viewer, or '' for uncolored.
+        """
+        if not account or obj is None:
+            return ''
+        custom = account.colorizer.get(obj, None)
+        if custom and custom != 'n':
+            return custom
+        if obj == account and colors["self"]:
+            return colors['self']
+        if obj == self.speaker and colors['speaker']:
+            return colors['speaker']
+        return ''
 
-        quote_color = colors["quotes"]
-        speech_color = colors["speech"]
-
-        def color_speech(found):
-            if not quote_color and not speech_color:
-                return f'"{found.group("found")}"'
-            if quote_color and not speech_color:
-                return f'|{quote_color}"|n{found.group("found")}|n|{quote_color}"|n'
-            if speech_color and not quote_color:
-                return f'"|n|{speech_color}{found.group("found")}|n"'
-            if quote_color and speech_color:
-                return f'|{quote_color}"|n|{speech_color}{found.group("found")}|n|{quote_color}"|n'
-
-        def color_names(found):
-            data = found.groupdict()
-            thing_name = data["thing_name"]
-            if not viewer:
-                return thing_name
-            thing_id = int(data["thing_id"])
-            if not (obj := self.controller.id_map.get(thing_id, None)):
-                return thing_name
-            custom = viewer.colorizer.get(obj, None)
-            if custom and custom != 'n':
-                return f"|n|{custom}{thing_name}|n"
-            if obj == viewer and colors["self"]:
-                return f"|n|{colors['self']}{thing_name}|n"
-            if obj == self.speaker and colors['speaker']:
-                return f"|n|{colors['speaker']}{thing_name}|n"
-            return thing_name
-
-        colorized_string = self.re_speech.sub(color_speech, message)
-        colorized_string = self.re_name.sub(color_names, colorized_string)
-        return colorized_string
+    def fill_template(self, template, signature):
+        """
+        Color a template.
+
+        Args:
+            template (tuple): A template from parse_template().
+            signature (tuple): A signature from color_signature().
+
+        Returns:
+            text (str): The colored markup.
+
+        """
+        quote_color, speech_color, names = signature
+        names = dict(names)
+        if quote_color and speech_color:
+            open_quote, close_quote = f'|{quote_color}"|n|{speech_color}', f'|n|{quote_color}"|n'
+        elif quote_color:
+            open_quote, close_quote = f'|{quote_color}"|n', f'|n|{quote_color}"|n'
+        elif speech_color:
+            open_quote, close_quote = f'"|n|{speech_color}', '|n"'
+        else:
+            open_quote, close_quote = '"', '"'
+
+        out = list()
+        for kind, value in template:
+            if kind == 'text':
+                out.append(value)
+            elif kind == 'open':
+                out.append(open_quote)
+            elif kind == 'close':
+                out.append(close_quote)
+            elif (color := names[value[0]]):
+                out.append(f"|n|{color}{value[1]}|n")
+            else:
+                out.append(value[1])
+        return ''.join(out)
+
+    def colorize(self, message, viewer):
+        template = self.parse_template(message)
+        return self.fill_template(template, self.color_signature(template, viewer))
 
 
 def iter_to_string(iter):
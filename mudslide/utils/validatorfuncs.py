@@ -11,11 +11,115 @@ They can employ more paramters at your leisure.
 import re as _re
 import pytz as _pytz
 import datetime as _dt
+from bisect import bisect_left as _bisect_left
+from collections.abc import Mapping as _Mapping
 from mudslide.utils.ansi import strip_ansi
-from mudslide.utils.misc import string_partial_matching as _partial, validate_email_address
+from mudslide.utils.misc import validate_email_address
 from django.utils.translation import gettext as _
 
-_TZ_DICT = {str(tz): _pytz.timezone(tz) for tz in _pytz.common_timezones}
+
+class _Timezones(_Mapping):
+    """
+    The common timezones by name. Nothing is read from pytz until first use, and each
+    timezone is only resolved to a tzinfo when it is asked for.
+
+    """
+
+    def __init__(self):
+        self._names = None
+        self._zones = dict()
+        self._keys = None
+        self._index = None
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = frozenset(_pytz.common_timezones)
+        return self._names
+
+    def __getitem__(self, name):
+        zone = self._zones.get(name, None)
+        if zone is None:
+            if name not in self.names:
+                raise KeyError(name)
+            zone = self._zones[name] = _pytz.timezone(name)
+        return zone
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __iter__(self):
+        return iter(sorted(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _key(text):
+        return text.strip().lower().replace(" ", "_")
+
+    def _build_index(self):
+        """
+        Index every timezone under its full name and each trailing part of it, so
+        'america/new_york', 'new_york' and 'new york' all find America/New_York.
+        """
+        entries = set()
+        for name in self.names:
+            parts = name.lower().split("/")
+            for start in range(len(parts)):
+                entries.add(("/".join(parts[start:]), name))
+        entries = sorted(entries)
+        self._keys = [key for key, name in entries]
+        self._index = [name for key, name in entries]
+
+    def search(self, entry):
+        """
+        Find timezones whose name, or a trailing part of it such as the city, starts with
+        the entry. Exact matches win over longer ones.
+
+        Args:
+            entry (str): User input.
+
+        Returns:
+            names (list): The matching timezone names, sorted.
+
+        """
+        if self._keys is None:
+            self._build_index()
+        key = self._key(entry)
+        if not key:
+            return []
+        exact = set()
+        found = set()
+        position = _bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position].startswith(key):
+            if self._keys[position] == key:
+                exact.add(self._index[position])
+            found.add(self._index[position])
+            position += 1
+        return sorted(exact or found)
+
+
+_TZ_DICT = _Timezones()
+
+
+def get_timezone(zone):
+    """
+    Resolve a timezone name to a tzinfo. Resolved timezones are cached.
+
+    Args:
+        zone (str or tzinfo): A timezone name. tzinfo objects are returned as they are.
+
+    Returns:
+        tzinfo (tzinfo): The timezone.
+
+    Raises:
+        KeyError: If there is no such timezone.
+
+    """
+    if isinstance(zone, _dt.tzinfo):
+        return zone
+    return _TZ_DICT[zone]
 
 
 def text(entry, option_key="Text", **kwargs):
@@ -63,7 +167,7 @@ def datetime(entry, option_key="Datetime", account=None, from_tz=None, **kwargs)
         if account:
             acct_tz = account.options.get("timezone", "UTC")
             try:
-                from_tz = _pytz.timezone(acct_tz)
+                from_tz = get_timezone(acct_tz)
             except Exception as err:
                 raise ValueError(
                     _("Timezone string '{acct_tz}' is not a valid timezone ({err})").format(
@@ -188,7 +292,8 @@ def boolean(entry, option_key="True/False", **kwargs):
 
 def timezone(entry, option_key="Timezone", **kwargs):
     """
-    Takes user input as string, and partial matches a Timezone.
+    Takes user input as string, and partial matches a Timezone by the start of its
+    full name or its city.
 
     Args:
         entry (str): The name of the Timezone.
@@ -199,7 +304,7 @@ def timezone(entry, option_key="Timezone", **kwargs):
     """
     if not entry:
         raise ValueError(f"No {option_key} entered!")
-    found = _partial(list(_TZ_DICT.keys()), entry, ret_index=False)
+    found = _TZ_DICT.search(entry)
     if len(found) > 1:
         raise ValueError(
             f"That matched: {', '.join(str(t) for t in found)}. Please be more specific!"
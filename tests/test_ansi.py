@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from mudslide.utils.ansi import SGR_DEFAULT, _SGR_RE, apply_sgr, minimize_sgr, parse_ansi
+
+
+def _render(string):
+    """
+    What a terminal shows for each character: the full state for visible characters,
+    and for blank space only what blank space can show.
+    """
+    shown = list()
+    state = SGR_DEFAULT
+    parts = _SGR_RE.split(string)
+    for index, text in enumerate(parts):
+        if index % 2:
+            state = apply_sgr(state, text)[0]
+            continue
+        for char in text:
+            if not char.isspace():
+                shown.append((char, state))
+                continue
+            hilite, underline, blink, inverse, fg, bg = state
+            if inverse:
+                shown.append((char, state))
+            elif underline:
+                shown.append((char, (hilite, underline, None, inverse, fg, bg)))
+            else:
+                shown.append((char, (None, underline, None, inverse, None, bg)))
+    return shown, state
+
+
+class TestMinimizeSGR(unittest.TestCase):
+
+    def assertSameRender(self, markup):
+        raw = parse_ansi(markup)
+        self.assertEqual(_render(raw), _render(minimize_sgr(raw)), markup)
+
+    def test_inverse_spaces_keep_foreground(self):
+        self.assertSameRender("|n|*|r   |g   |n")
+
+    def test_underlined_spaces_keep_foreground(self):
+        self.assertSameRender("|n|u|r   |g   x|n")
+
+    def test_plain_spaces_drop_foreground(self):
+        raw = parse_ansi("|n|r   |g   x|n")
+        self.assertEqual(_render(raw), _render(minimize_sgr(raw)))
+        self.assertLessEqual(len(minimize_sgr(raw)), len(raw))
+
+    def test_random_markup_renders_the_same(self):
+        rng = random.Random(1234)
+        codes = ["|n", "|r", "|g", "|b", "|R", "|h", "|H", "|u", "|U", "|*", "|[r", "|[b", "|500", "|[005"]
+        texts = [" ", "  ", "   ", "x", "ab", " y ", "\t"]
+        for _ in range(2000):
+            markup = "|n" + "".join(rng.choice(codes) + rng.choice(texts) for _ in range(rng.randint(1, 8))) + "|n"
+            self.assertSameRender(markup)
+
+    def assertSameRenderAfter(self, prefix, raw):
+        # minimize_sgr doesn't know what the terminal had active before the text.
+        self.assertEqual(_render(prefix + raw), _render(prefix + minimize_sgr(raw)), (prefix, raw))
+
+    def test_unknown_start_keeps_foreground_on_spaces(self):
+        self.assertSameRenderAfter("\033[4;7m", "\033[38;2;255;0;0m\t")
+        self.assertSameRenderAfter("\033[4;7m", "\033[22m\033[31mx\033[1m\033[32m\t")
+
+    def test_random_markup_after_active_state(self):
+        rng = random.Random(4321)
+        prefixes = ["", "\033[4m", "\033[7m", "\033[4;7m", "\033[1;31;4m", "\033[7;44m"]
+        codes = ["|n", "|r", "|g", "|R", "|h", "|H", "|u", "|U", "|*", "|[b", "|500", "|[005"]
+        texts = [" ", "  ", "x", " y ", "\t"]
+        for _ in range(2000):
+            markup = "".join(rng.choice(codes) + rng.choice(texts) for _ in range(rng.randint(1, 8)))
+            self.assertSameRenderAfter(rng.choice(prefixes), parse_ansi(markup))
@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from mudslide.utils.dataloader import DataLoader
+
+
+class TestDataLoader(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.calls = list()
+
+    def batch(self, keys):
+        self.calls.append(list(keys))
+        return {key: key * 10 for key in keys if key >= 0}
+
+    async def test_same_tick_is_one_batch(self):
+        loader = DataLoader(self.batch)
+        results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(3))
+        self.assertEqual(results, [10, 20, 30])
+        self.assertEqual(self.calls, [[1, 2, 3]])
+
+    async def test_load_many(self):
+        loader = DataLoader(self.batch)
+        self.assertEqual(await loader.load_many([4, 5]), [40, 50])
+        self.assertEqual(self.calls, [[4, 5]])
+
+    async def test_results_are_cached(self):
+        loader = DataLoader(self.batch)
+        self.assertEqual(await loader.load(1), 10)
+        self.assertEqual(await asyncio.gather(loader.load(1), loader.load(2)), [10, 20])
+        self.assertEqual(self.calls, [[1], [2]])
+
+    async def test_repeated_key_in_a_tick(self):
+        loader = DataLoader(self.batch)
+        self.assertEqual(await asyncio.gather(loader.load(1), loader.load(1)), [10, 10])
+        self.assertEqual(self.calls, [[1]])
+
+    async def test_prime_and_clear(self):
+        loader = DataLoader(self.batch)
+        loader.prime(1, 'primed')
+        self.assertEqual(await loader.load(1), 'primed')
+        loader.clear(1)
+        self.assertEqual(await loader.load(1), 10)
+        self.assertEqual(self.calls, [[1]])
+
+    async def test_default(self):
+        self.assertIsNone(await DataLoader(self.batch).load(-1))
+        self.assertEqual(await DataLoader(self.batch, default=list).load(-1), [])
+
+    async def test_runner(self):
+        async def runner(func, keys):
+            return func(keys)
+        loader = DataLoader(self.batch, runner)
+        self.assertEqual(await asyncio.gather(loader.load(1), loader.load(2)), [10, 20])
+        self.assertEqual(self.calls, [[1, 2]])
+
+    async def test_exception_reaches_every_key_and_is_not_cached(self):
+        def failing(keys):
+            self.calls.append(list(keys))
+            raise RuntimeError("no database")
+        loader = DataLoader(failing)
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        loader.batch_func = self.batch
+        self.assertEqual(await loader.load(1), 10)
+        self.assertEqual(self.calls, [[1, 2], [1]])
@@ -0,0 +1,43 @@
+import unittest
+
+from mudslide.utils.evtable import EvCell, EvTable, _RENDER_CACHE
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        _RENDER_CACHE.clear()
+
+    def make_table(self):
+        table = EvTable("Name", "Score", cache=True, width=30)
+        table.add_row("Alice", "1")
+        table.add_row("Bob", "22")
+        return table
+
+    def test_cached_render_is_reused(self):
+        first = str(self.make_table())
+        self.assertEqual(first, str(self.make_table()))
+        self.assertEqual(len(_RENDER_CACHE), 1)
+
+    def test_reformat_cell_changes_the_key(self):
+        plain = str(self.make_table())
+        table = self.make_table()
+        table.table[0].reformat_cell(1, align="r")
+        uncached = EvTable("Name", "Score", width=30)
+        uncached.add_row("Alice", "1")
+        uncached.add_row("Bob", "22")
+        uncached.table[0].reformat_cell(1, align="r")
+        self.assertEqual(str(table), str(uncached))
+        self.assertNotEqual(str(table), plain)
+
+    def test_cell_objects_change_the_key(self):
+        plain = str(self.make_table())
+        table = EvTable("Name", "Score", cache=True, width=30)
+        table.add_row(EvCell("Alice", align="r"), "1")
+        table.add_row("Bob", "22")
+        uncached = EvTable("Name", "Score", width=30)
+        uncached.add_row(EvCell("Alice", align="r"), "1")
+        uncached.add_row("Bob", "22")
+        self.assertEqual(str(table), str(uncached))
+        self.assertNotEqual(str(table), plain)
+        self.assertEqual(len(_RENDER_CACHE), 2)
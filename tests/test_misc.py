@@ -0,0 +1,32 @@
+import unittest
+
+from mudslide.utils.ansi import ANSIString
+from mudslide.utils.misc import char_width, display_len, text_width
+
+
+class TestDisplayWidth(unittest.TestCase):
+
+    def test_char_width(self):
+        self.assertEqual(char_width("a"), 1)
+        self.assertEqual(char_width("é"), 1)
+        self.assertEqual(char_width("́"), 0)
+        self.assertEqual(char_width("­"), 1)
+        self.assertEqual(char_width("中"), 2)
+        self.assertEqual(char_width("Ａ"), 2)
+        self.assertEqual(char_width("\U0001f600"), 2)
+        self.assertEqual(char_width("͸"), 1)
+
+    def test_text_width(self):
+        self.assertEqual(text_width("abc"), 3)
+        self.assertEqual(text_width("中文x"), 5)
+        self.assertEqual(text_width("é"), 1)
+
+    def test_display_len_strips_markup(self):
+        self.assertEqual(display_len("|rred|n"), 3)
+        self.assertEqual(display_len(ANSIString("|rred|n")), 3)
+        self.assertEqual(display_len(ANSIString("|r中文|n")), 4)
+
+    def test_display_len_strips_mxp(self):
+        markup = "|lcsay x|ltclick|le"
+        self.assertEqual(display_len(markup), 5)
+        self.assertEqual(display_len(ANSIString(markup)), 5)
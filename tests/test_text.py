@@ -0,0 +1,118 @@
+import unittest
+from types import SimpleNamespace
+
+from mudslide.utils.text import Speech
+
+
+def _reference_colorize(speech, message, viewer):
+    """
+    Speech coloring done directly with the regexes, one viewer at a time.
+    """
+    viewer = viewer.get_account()
+    colors = dict()
+    for op in ("quotes", "speech", "speaker", "self", "other"):
+        colors[op] = viewer.styler.options.get(f"{op}_{speech.color_mode}", '')
+        if colors[op] == 'n':
+            colors[op] = ''
+    quote_color, speech_color = colors["quotes"], colors["speech"]
+
+    def color_speech(found):
+        text = found.group("found")
+        if quote_color and speech_color:
+            return f'|{quote_color}"|n|{speech_color}{text}|n|{quote_color}"|n'
+        if quote_color:
+            return f'|{quote_color}"|n{text}|n|{quote_color}"|n'
+        if speech_color:
+            return f'"|n|{speech_color}{text}|n"'
+        return f'"{text}"'
+
+    def color_names(found):
+        name = found.group("thing_name")
+        if not (obj := speech.controller.id_map.get(int(found.group("thing_id")), None)):
+            return name
+        custom = viewer.colorizer.get(obj, None)
+        if custom and custom != 'n':
+            return f"|n|{custom}{name}|n"
+        if obj == viewer and colors["self"]:
+            return f"|n|{colors['self']}{name}|n"
+        if obj == speech.speaker and colors['speaker']:
+            return f"|n|{colors['speaker']}{name}|n"
+        return name
+
+    return speech.re_name.sub(color_names, speech.re_speech.sub(color_speech, message))
+
+
+class _Viewer:
+    """
+    Stands in for a connection.
+    """
+
+    def __init__(self, account):
+        self.account = account
+
+    def get_account(self):
+        return self.account
+
+
+class _Account:
+    """
+    Stands in for an AccountEntity: hashable, with a colorizer and styler options.
+    """
+
+    def __init__(self, key, colorizer, options):
+        self.key = key
+        self.colorizer = colorizer
+        self.styler = SimpleNamespace(options=options)
+
+
+def _account(key, colorizer=None, **options):
+    return _Account(key, colorizer or dict(), options)
+
+
+def _speech(speaker, text, id_map, special_format=0):
+    speech = Speech.__new__(Speech)
+    speech.controller = SimpleNamespace(id_map=id_map)
+    speech.speaker = speaker
+    speech.special_format = special_format
+    speech.markup_name = f"^^^1:{speaker.key}^^^"
+    speech.markup_string = text
+    speech.action_string = "says"
+    speech.title = None
+    speech.mode = "ooc"
+    speech.targets = []
+    speech.color_mode = "channel"
+    return speech
+
+
+class TestSpeechRenderMany(unittest.TestCase):
+
+    def test_render_many_matches_reference(self):
+        alice = _account("Alice")
+        bob = _account("Bob", quotes_channel="y", speech_channel="c", self_channel="r")
+        carol = _account("Carol", speaker_channel="g", speech_channel="n")
+        dave = _account("Dave", quotes_channel="b", colorizer={alice: "m"})
+        erin = _account("Erin", quotes_channel="b", colorizer={alice: "m"})
+        id_map = {1: alice, 2: bob, 3: carol}
+        viewers = [_Viewer(account) for account in (alice, bob, carol, dave, erin)]
+        texts = [
+            'hello ^^^2:Bob^^^ and "^^^3:Carol^^^ too"',
+            'waves at ^^^9:Nobody^^^.',
+            '"one" and "two ^^^1:Alice^^^"',
+        ]
+        for special_format in (0, 1, 2, 3):
+            for text in texts:
+                speech = _speech(alice, text, id_map, special_format)
+                renders = speech.render_many(viewers)
+                for viewer in viewers:
+                    expected = _reference_colorize(speech, speech.render_markup(), viewer)
+                    self.assertEqual(renders[viewer], expected)
+                    self.assertEqual(speech.render(viewer), expected)
+
+    def test_viewers_with_the_same_colors_share_a_render(self):
+        alice = _account("Alice")
+        dave = _account("Dave", quotes_channel="b")
+        erin = _account("Erin", quotes_channel="b")
+        speech = _speech(alice, 'hi "there"', {1: alice})
+        viewers = [_Viewer(dave), _Viewer(erin)]
+        renders = speech.render_many(viewers)
+        self.assertIs(renders[viewers[0]], renders[viewers[1]])
@@ -0,0 +1,38 @@
+import unittest
+
+import pytz
+
+from mudslide.utils import validatorfuncs
+from mudslide.utils.validatorfuncs import _TZ_DICT, get_timezone
+
+
+class TestTimezoneSearch(unittest.TestCase):
+
+    def test_full_name(self):
+        self.assertEqual(_TZ_DICT.search("America/New_York"), ["America/New_York"])
+
+    def test_city_with_spaces(self):
+        self.assertEqual(_TZ_DICT.search("new york"), ["America/New_York"])
+        self.assertEqual(validatorfuncs.timezone("new york"), pytz.timezone("America/New_York"))
+
+    def test_prefix_matches_every_candidate(self):
+        found = _TZ_DICT.search("america/new")
+        self.assertIn("America/New_York", found)
+        self.assertEqual(found, sorted(found))
+
+    def test_exact_beats_longer_matches(self):
+        self.assertEqual(_TZ_DICT.search("utc"), ["UTC"])
+
+    def test_ambiguous_and_unknown(self):
+        with self.assertRaises(ValueError):
+            validatorfuncs.timezone("america/")
+        with self.assertRaises(ValueError):
+            validatorfuncs.timezone("Atlantis/Nowhere")
+        self.assertEqual(_TZ_DICT.search(""), [])
+
+    def test_get_timezone(self):
+        zone = get_timezone("Europe/London")
+        self.assertIs(get_timezone(zone), zone)
+        self.assertIs(get_timezone("Europe/London"), zone)
+        with self.assertRaises(KeyError):
+            get_timezone("Atlantis/Nowhere")